@@ -1,89 +1,180 @@
-
-from flask import Flask, request, jsonify
-import subprocess
-import os
-import json
-
-app = Flask(__name__)
-
-@app.route('/add_url', methods=['POST'])
-def add_url():
-    data = request.get_json()
-    urls = data.get('urls', [])
-    if urls:
-        with open('my_scraper/urls.txt', 'a') as f:
-            for url in urls:
-                f.write(url + '\n')
-        return jsonify({"message": "URLs added", "urls": urls}), 200
-    return jsonify({"message": "No URLs provided"}), 400
-
-@app.route('/list_urls', methods=['GET'])
-def list_urls():
-    if os.path.exists('my_scraper/urls.txt'):
-        with open('my_scraper/urls.txt', 'r') as f:
-            urls = f.readlines()
-        return jsonify({"urls": [url.strip() for url in urls]}), 200
-    return jsonify({"message": "No URLs found"}), 404
-
-@app.route('/clear_urls', methods=['DELETE'])
-def clear_urls():
-    if os.path.exists('my_scraper/urls.txt'):
-        os.remove('my_scraper/urls.txt')
-        return jsonify({"message": "All URLs cleared"}), 200
-    return jsonify({"message": "No URLs to clear"}), 404
-
-@app.route('/set_proxy', methods=['POST'])
-def set_proxy():
-    data = request.get_json()
-    proxy = data.get('proxy', "")
-    if proxy:
-        with open('my_scraper/proxy.txt', 'w') as f:
-            f.write(proxy)
-        return jsonify({"message": "Proxy set", "proxy": proxy}), 200
-    return jsonify({"message": "No proxy provided"}), 400
-
-@app.route('/clear_proxy', methods=['DELETE'])
-def clear_proxy():
-    if os.path.exists('my_scraper/proxy.txt'):
-        os.remove('my_scraper/proxy.txt')
-        return jsonify({"message": "Proxy cleared"}), 200
-    return jsonify({"message": "No proxy to clear"}), 404
-
-@app.route('/run_scraper', methods=['POST'])
-def run_scraper():
-    if os.path.exists('my_scraper/urls.txt'):
-        proxy = None
-        if os.path.exists('my_scraper/proxy.txt'):
-            with open('my_scraper/proxy.txt', 'r') as f:
-                proxy = f.read().strip()
-        command = ['python', 'my_scraper/scraper.py']
-        if proxy:
-            command.append(proxy)
-        subprocess.run(command)
-        return jsonify({"message": "Scraper executed"}), 200
-    return jsonify({"message": "No URLs found. Add URLs before running the scraper."}), 400
-
-@app.route('/report_error', methods=['POST'])
-def report_error():
-    data = request.get_json()
-    error_message = data.get('error_message', '')
-    if error_message:
-        # Log the error message
-        with open('error_log.txt', 'a') as f:
-            f.write(error_message + '\n')
-        return jsonify({"message": "Error reported", "error_message": error_message}), 200
-    return jsonify({"message": "No error message provided"}), 400
-
-@app.route('/request_improvement', methods=['POST'])
-def request_improvement():
-    data = request.get_json()
-    improvement_request = data.get('improvement_request', '')
-    if improvement_request:
-        # Log the improvement request
-        with open('improvement_requests.txt', 'a') as f:
-            f.write(improvement_request + '\n')
-        return jsonify({"message": "Improvement request submitted", "improvement_request": improvement_request}), 200
-    return jsonify({"message": "No improvement request provided"}), 400
-
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+
+from flask import Flask, request, jsonify, Response, stream_with_context
+import subprocess
+import os
+import threading
+from metrics import render_prometheus
+from results_db import MAX_LIMIT, ResultsStore
+from results_export import export_chunks, int_arg, results_filters
+from singleflight import flights
+from live_scrape import BackgroundPool, ScrapeError, ScrapeTimeout, parse_max_age
+from url_import import import_urls, request_format
+from utils import URLS_FILE, PROXY_FILE, load_config, read_metrics, read_urls, append_urls, read_proxies, write_proxies, remove_file
+
+app = Flask(__name__)
+
+# Warm browser contexts for /scrape, started on first use.
+live_pool = None
+live_pool_lock = threading.Lock()
+
+def get_live_pool():
+    global live_pool
+    with live_pool_lock:
+        if live_pool is None:
+            live_pool = BackgroundPool(load_config())
+    return live_pool
+
+@app.route('/add_url', methods=['POST'])
+def add_url():
+    data = request.get_json()
+    urls = data.get('urls', [])
+    if urls:
+        append_urls(urls)
+        return jsonify({"message": "URLs added", "urls": urls}), 200
+    return jsonify({"message": "No URLs provided"}), 400
+
+@app.route('/import_urls', methods=['POST'])
+def import_urls_endpoint():
+    # Multipart upload in "file", or the raw (optionally gzipped) body.
+    upload = request.files.get('file')
+    if upload is not None:
+        file_format = request_format(request.args.get('format'), upload.filename)
+        counts = import_urls(upload.stream, file_format)
+    else:
+        file_format = request_format(request.args.get('format'), content_type=request.content_type)
+        counts = import_urls(request.stream, file_format)
+    if not counts['read']:
+        return jsonify(dict(counts, message="No URLs provided")), 400
+    return jsonify(dict(counts, message="URLs imported")), 200
+
+@app.route('/list_urls', methods=['GET'])
+def list_urls():
+    urls = read_urls()
+    if urls is not None:
+        return jsonify({"urls": urls}), 200
+    return jsonify({"message": "No URLs found"}), 404
+
+@app.route('/clear_urls', methods=['DELETE'])
+def clear_urls():
+    if remove_file(URLS_FILE):
+        return jsonify({"message": "All URLs cleared"}), 200
+    return jsonify({"message": "No URLs to clear"}), 404
+
+@app.route('/set_proxy', methods=['POST'])
+def set_proxy():
+    data = request.get_json()
+    proxy = data.get('proxy', "")
+    proxies = data.get('proxies') or ([proxy] if proxy else [])
+    if proxies:
+        write_proxies(proxies)
+        return jsonify({"message": "Proxy set", "proxy": proxies[0], "proxies": proxies}), 200
+    return jsonify({"message": "No proxy provided"}), 400
+
+@app.route('/clear_proxy', methods=['DELETE'])
+def clear_proxy():
+    if remove_file(PROXY_FILE):
+        return jsonify({"message": "Proxy cleared"}), 200
+    return jsonify({"message": "No proxy to clear"}), 404
+
+@app.route('/run_scraper', methods=['POST'])
+def run_scraper():
+    if os.path.exists(URLS_FILE):
+        command = ['python', 'my_scraper/scraper.py']
+        command.extend(read_proxies())
+        data = request.get_json(silent=True) or {}
+        if data.get('profile'):
+            command.append('--profile')
+        subprocess.run(command)
+        return jsonify({"message": "Scraper executed"}), 200
+    return jsonify({"message": "No URLs found. Add URLs before running the scraper."}), 400
+
+@app.route('/scrape', methods=['POST'])
+def scrape():
+    data = request.get_json(silent=True) or {}
+    url = data.get('url', '')
+    if not url:
+        return jsonify({"message": "No URL provided"}), 400
+    try:
+        max_age = parse_max_age(data.get('max_age'))
+        result = get_live_pool().scrape(url, max_age)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except ScrapeTimeout as e:
+        return jsonify({"message": str(e)}), 504
+    except ScrapeError as e:
+        return jsonify({"message": str(e)}), 502
+    return jsonify(result), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Metrics of the last finished run, written by scraper.py on exit.
+    summary = read_metrics()
+    # Fetches shared in this process, and the warm pool's /scrape lookups.
+    summary['counters'] = summary.get('counters', []) + flights.counters_summary()
+    if live_pool is not None and live_pool.pool is not None:
+        summary['counters'] += live_pool.pool.counters_summary()
+    return Response(render_prometheus(summary), mimetype='text/plain; version=0.0.4')
+
+@app.route('/results', methods=['GET'])
+def results():
+    if not os.path.exists('results.db'):
+        return jsonify({"message": "No results found"}), 404
+    store = ResultsStore()
+    try:
+        filters = results_filters(store, request.args.to_dict())
+        limit = max(1, min(request.args.get('limit', 100, type=int), MAX_LIMIT))
+        items, cursor = store.query(after=int_arg(request.args, 'after', 0), limit=limit, **filters)
+        return jsonify({"results": items, "next": cursor}), 200
+    finally:
+        store.close()
+
+@app.route('/results/export', methods=['GET'])
+def export_results():
+    if not os.path.exists('results.db'):
+        return jsonify({"message": "No results found"}), 404
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"message": "Unsupported format, use ndjson or csv"}), 400
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    chunks = export_chunks(ResultsStore(), request.args.to_dict(), export_format, use_gzip)
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+@app.route('/runs', methods=['GET'])
+def runs():
+    if not os.path.exists('results.db'):
+        return jsonify({"runs": []}), 200
+    store = ResultsStore()
+    try:
+        return jsonify({"runs": store.runs(request.args.get('limit', 50, type=int))}), 200
+    finally:
+        store.close()
+
+@app.route('/report_error', methods=['POST'])
+def report_error():
+    data = request.get_json()
+    error_message = data.get('error_message', '')
+    if error_message:
+        # Log the error message
+        with open('error_log.txt', 'a') as f:
+            f.write(error_message + '\n')
+        return jsonify({"message": "Error reported", "error_message": error_message}), 200
+    return jsonify({"message": "No error message provided"}), 400
+
+@app.route('/request_improvement', methods=['POST'])
+def request_improvement():
+    data = request.get_json()
+    improvement_request = data.get('improvement_request', '')
+    if improvement_request:
+        # Log the improvement request
+        with open('improvement_requests.txt', 'a') as f:
+            f.write(improvement_request + '\n')
+        return jsonify({"message": "Improvement request submitted", "improvement_request": improvement_request}), 200
+    return jsonify({"message": "No improvement request provided"}), 400
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,202 @@
+
+import gzip
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from utils import url_host
+from zstd_dicts import ZSTD_MAGIC, DictionaryStore
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    status INTEGER,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_url ON records (url, id);
+"""
+
+ARCHIVE_DEFAULTS = {
+    'directory': 'archive',
+    # "gzip", or "zstd" for per-host dictionary compression (see zstd_dicts).
+    'compression': 'gzip',
+    'compression_level': 6,
+    'index_batch': 100,
+    'dictionaries': {},
+}
+
+
+def encode_record(url, html, status=None, headers=None, fetched_at=None):
+    # A WARC/1.1 "response" record: the HTTP status line and headers from
+    # the navigation response, followed by the rendered HTML as the body.
+    fetched_at = fetched_at or time.time()
+    body = html.encode('utf-8')
+    http_lines = [f"HTTP/1.1 {status or 200}"]
+    http_lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    block = ('\r\n'.join(http_lines) + '\r\n\r\n').encode('utf-8') + body
+    date = datetime.fromtimestamp(fetched_at, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    warc_headers = [
+        'WARC/1.1',
+        'WARC-Type: response',
+        f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+        f'WARC-Date: {date}',
+        f'WARC-Target-URI: {url}',
+        'Content-Type: application/http; msgtype=response',
+        f'Content-Length: {len(block)}',
+    ]
+    return ('\r\n'.join(warc_headers) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+def parse_headers(raw):
+    headers = {}
+    for line in raw.decode('utf-8', errors='replace').split('\r\n')[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    return headers
+
+
+def decode_record(record):
+    warc_raw, _, rest = record.partition(b'\r\n\r\n')
+    warc_headers = parse_headers(warc_raw)
+    block = rest[:int(warc_headers['Content-Length'])]
+    http_raw, _, body = block.partition(b'\r\n\r\n')
+    status_line = http_raw.split(b'\r\n', 1)[0].decode('utf-8', errors='replace')
+    return {
+        'url': warc_headers['WARC-Target-URI'],
+        'date': warc_headers['WARC-Date'],
+        'status': int(status_line.split()[1]) if len(status_line.split()) > 1 else None,
+        'headers': parse_headers(http_raw),
+        'html': body.decode('utf-8', errors='replace'),
+    }
+
+
+def open_index(directory):
+    conn = sqlite3.connect(os.path.join(directory, 'index.db'), timeout=30, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(INDEX_SCHEMA)
+    return conn
+
+
+class ArchiveWriter:
+    # Append-only: each run writes a new segment file and every record is
+    # its own gzip member or zstd frame, so a record can be read back from
+    # its offset without touching the rest of the segment.
+    def __init__(self, directory='archive', compression_level=6, index_batch=100, compression='gzip',
+                 dictionaries=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compression_level = compression_level
+        self.index_batch = index_batch
+        self.dictionaries = None
+        extension = 'gz'
+        if compression == 'zstd':
+            self.dictionaries = DictionaryStore.from_options(
+                os.path.join(directory, 'dictionaries'), dict(dictionaries or {}, level=compression_level))
+            extension = 'zst'
+        # Every writer gets a segment of its own, even several in one process
+        # within the same second (parallel scheduled jobs); offsets in the
+        # index are only valid for a file nobody else appends to.
+        self.segment = (f"segment-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+                        f".warc.{extension}")
+        self.file = open(os.path.join(directory, self.segment), 'xb')
+        self.offset = 0
+        self.index = open_index(directory)
+        self.pending = []
+        self.records = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        options = config.get('archive')
+        if not options:
+            return None
+        options = dict(ARCHIVE_DEFAULTS, **(options if isinstance(options, dict) else {}))
+        return cls(options['directory'], options['compression_level'], options['index_batch'],
+                   options['compression'], options['dictionaries'])
+
+    def compress(self, url, record):
+        if self.dictionaries:
+            return self.dictionaries.compress(url_host(url), record)
+        return gzip.compress(record, self.compression_level)
+
+    def write(self, url, html, status=None, headers=None):
+        fetched_at = time.time()
+        # Compression happens outside the lock; only the append is serialized.
+        data = self.compress(url, encode_record(url, html, status, headers, fetched_at))
+        with self.lock:
+            self.file.write(data)
+            self.pending.append((url, fetched_at, status, self.segment, self.offset, len(data)))
+            self.offset += len(data)
+            self.records += 1
+            if len(self.pending) >= self.index_batch:
+                self.flush_index()
+
+    def flush_index(self):
+        # The segment is flushed before its index rows are committed, so the
+        # index never points past the end of a file.
+        self.file.flush()
+        with self.index:
+            self.index.executemany(
+                "INSERT INTO records (url, fetched_at, status, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?)",
+                self.pending)
+        self.pending = []
+
+    def close(self):
+        with self.lock:
+            if self.pending:
+                self.flush_index()
+            self.file.close()
+            self.index.close()
+        logging.info(f"Archived {self.records} pages to {os.path.join(self.directory, self.segment)}")
+
+
+class ArchiveReader:
+    def __init__(self, directory='archive'):
+        self.directory = directory
+        self.index = open_index(directory)
+        self.files = {}
+        self.dictionaries = None
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.index.close()
+
+    def read_at(self, segment, offset, length):
+        f = self.files.get(segment)
+        if f is None:
+            f = self.files[segment] = open(os.path.join(self.directory, segment), 'rb')
+        f.seek(offset)
+        return decode_record(self.decompress(f.read(length)))
+
+    def decompress(self, data):
+        # The codec is told apart by magic bytes, so gzip and zstd segments
+        # can sit in the same archive.
+        if data[:4] == ZSTD_MAGIC:
+            if self.dictionaries is None:
+                self.dictionaries = DictionaryStore(os.path.join(self.directory, 'dictionaries'))
+            return self.dictionaries.decompress(data)
+        return gzip.decompress(data)
+
+    def get(self, url):
+        row = self.index.execute(
+            "SELECT segment, offset, length FROM records WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)).fetchone()
+        return self.read_at(*row) if row else None
+
+    def locations(self, since=None):
+        # Latest record per URL, ordered by position so replay reads each
+        # segment sequentially.
+        sql = ("SELECT segment, offset, length FROM records WHERE id IN "
+               "(SELECT MAX(id) FROM records WHERE fetched_at >= ? GROUP BY url) ORDER BY segment, offset")
+        return self.index.execute(sql, (since or 0,)).fetchall()
+
+    def count(self):
+        return self.index.execute("SELECT COUNT(DISTINCT url) FROM records").fetchone()[0]
@@ -0,0 +1,85 @@
+
+import logging
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from output_files import atomic_path
+from utils import url_host
+
+PARQUET_DEFAULTS = {
+    'compression': 'zstd',
+    'compression_level': None,
+    'row_group_size': 128 * 1024,
+    # Columns whose distinct values stay below this share of the rows are
+    # written dictionary-encoded; the rest are written as plain strings.
+    'dictionary_ratio': 0.5,
+    'partition_by': [],
+}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow output: pip install pyarrow")
+
+
+def build_table(data, options, crawl_date=None):
+    table = data.to_arrow(include_source=True)
+    rows = max(len(data), 1)
+    dictionary_columns = []
+    for name, column in data.columns.items():
+        if column.is_dictionary and len(column.values) <= rows * options['dictionary_ratio']:
+            dictionary_columns.append(name)
+        else:
+            index = table.schema.get_field_index(name)
+            table = table.set_column(index, name, table.column(name).cast(pa.string()))
+
+    sources = table.column(data.sources.name).combine_chunks()
+    hosts = pa.array([url_host(source) for source in data.sources.values], type=pa.string())
+    table = table.append_column('host', hosts.take(sources.indices))
+    crawl_date = pa.scalar(crawl_date or time.strftime('%Y-%m-%d'), type=pa.string())
+    table = table.append_column('crawl_date', pa.repeat(crawl_date, len(table)))
+    table = table.set_column(
+        table.schema.get_field_index(data.sources.name), data.sources.name, sources.cast(pa.string()))
+    return table, dictionary_columns
+
+
+def save_to_parquet(data, filename, options=None, crawl_date=None):
+    require_pyarrow()
+    options = dict(PARQUET_DEFAULTS, **(options or {}))
+    table, dictionary_columns = build_table(data, options, crawl_date)
+    write_options = {
+        'compression': options['compression'],
+        'compression_level': options['compression_level'],
+        'use_dictionary': dictionary_columns,
+        'row_group_size': options['row_group_size'],
+    }
+    if options['partition_by']:
+        # Hive-style directories, e.g. output.parquet/host=.../crawl_date=.../
+        # A rerun replaces the partitions it writes instead of adding files
+        # next to the old ones; other partitions (earlier crawl dates) stay.
+        pq.write_to_dataset(table, filename, partition_cols=options['partition_by'],
+                            existing_data_behavior='delete_matching', **write_options)
+    else:
+        with atomic_path(filename) as tmp_path:
+            pq.write_table(table, tmp_path, **write_options)
+    logging.info(f"Parquet written to {filename} ({len(table)} rows, dictionary columns: {dictionary_columns})")
+
+
+def save_to_arrow(data, filename, options=None, crawl_date=None):
+    require_pyarrow()
+    options = dict(PARQUET_DEFAULTS, **(options or {}))
+    table, _ = build_table(data, options, crawl_date)
+    # Arrow IPC only supports lz4 and zstd buffer compression.
+    compression = options['compression'] if options['compression'] in ('lz4', 'zstd') else None
+    write_options = pa.ipc.IpcWriteOptions(compression=compression)
+    with atomic_path(filename) as tmp_path:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=write_options) as writer:
+                writer.write_table(table, max_chunksize=options['row_group_size'])
+    logging.info(f"Arrow IPC written to {filename} ({len(table)} rows)")
@@ -0,0 +1,332 @@
+
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from live_scrape import ScrapeError, ScrapeTimeout, WarmPool, parse_max_age
+from metrics import render_prometheus
+from profiling import RunProfiler
+from results_db import MAX_LIMIT, ResultsStore
+from results_export import export_chunks, int_arg, results_filters
+from scraper import DynamicContentScraper, run_job
+from singleflight import flights
+from url_import import import_urls, request_format
+from utils import URLS_FILE, PROXY_FILE, load_config, read_metrics, read_urls, append_urls, read_proxies, write_proxies, remove_file
+
+# Async control API: same paths and payloads as api.py, but scraper runs
+# are tasks on this server's event loop instead of blocking subprocesses.
+jobs = {}
+current = {'job_id': None, 'scraper': None}
+warm = {'pool': None, 'lock': None}
+
+
+async def json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return {}
+
+
+async def add_url(request):
+    urls = (await json_body(request)).get('urls', [])
+    if urls:
+        await asyncio.to_thread(append_urls, urls)
+        return JSONResponse({"message": "URLs added", "urls": urls})
+    return JSONResponse({"message": "No URLs provided"}, 400)
+
+
+def import_spooled(spool, file_format):
+    try:
+        spool.seek(0)
+        return import_urls(spool, file_format)
+    finally:
+        spool.close()
+
+
+async def import_urls_endpoint(request):
+    # The body (plain, CSV or gzip) is spooled to disk as it arrives and
+    # imported in a worker thread, so the loop never holds the whole file.
+    file_format = request_format(request.query_params.get('format'), content_type=request.headers.get('content-type'))
+    spool = tempfile.TemporaryFile()
+    async for chunk in request.stream():
+        if chunk:
+            await asyncio.to_thread(spool.write, chunk)
+    counts = await asyncio.to_thread(import_spooled, spool, file_format)
+    if not counts['read']:
+        return JSONResponse(dict(counts, message="No URLs provided"), 400)
+    return JSONResponse(dict(counts, message="URLs imported"))
+
+
+async def list_urls(request):
+    urls = await asyncio.to_thread(read_urls)
+    if urls is not None:
+        return JSONResponse({"urls": urls})
+    return JSONResponse({"message": "No URLs found"}, 404)
+
+
+async def clear_urls(request):
+    if await asyncio.to_thread(remove_file, URLS_FILE):
+        return JSONResponse({"message": "All URLs cleared"})
+    return JSONResponse({"message": "No URLs to clear"}, 404)
+
+
+async def set_proxy(request):
+    data = await json_body(request)
+    proxy = data.get('proxy', "")
+    proxies = data.get('proxies') or ([proxy] if proxy else [])
+    if proxies:
+        await asyncio.to_thread(write_proxies, proxies)
+        return JSONResponse({"message": "Proxy set", "proxy": proxies[0], "proxies": proxies})
+    return JSONResponse({"message": "No proxy provided"}, 400)
+
+
+async def clear_proxy(request):
+    if await asyncio.to_thread(remove_file, PROXY_FILE):
+        return JSONResponse({"message": "Proxy cleared"})
+    return JSONResponse({"message": "No proxy to clear"}, 404)
+
+
+def job_config():
+    config = load_config()
+    urls = read_urls()
+    if urls:
+        config['urls'] = urls
+    proxies = read_proxies()
+    if proxies:
+        config['proxies'] = proxies
+    config['parse_in_thread'] = True
+    return config
+
+
+async def execute_job(job_id, scraper, config):
+    job = jobs[job_id]
+    try:
+        summary = await run_job(scraper, config)
+        job.update(status='finished', rows=len(scraper.data), duration=summary['duration'])
+    except Exception as e:
+        logging.error(f"Scraper job {job_id} failed: {e}")
+        job.update(status='failed', error=str(e))
+    finally:
+        job['finished'] = time.time()
+
+
+def progress_listener(job):
+    def listener(event):
+        if event['type'] == 'progress':
+            job['progress'] = {key: value for key, value in event.items() if key != 'type'}
+    return listener
+
+
+async def run_scraper(request):
+    if not os.path.exists(URLS_FILE):
+        return JSONResponse({"message": "No URLs found. Add URLs before running the scraper."}, 400)
+    running = jobs.get(current['job_id'])
+    if running and running['status'] == 'running':
+        return JSONResponse({"message": "Scraper already running", "job_id": current['job_id']}, 409)
+
+    # The slot is taken before the first await, so a second request
+    # arriving while this one reads its config gets the 409 above.
+    job_id = uuid.uuid4().hex
+    jobs[job_id] = {'status': 'running', 'started': time.time()}
+    current.update(job_id=job_id, scraper=None)
+    try:
+        profile = (await json_body(request)).get('profile')
+        config = await asyncio.to_thread(job_config)
+        scraper = DynamicContentScraper(config)
+    except Exception as e:
+        logging.error(f"Scraper job {job_id} failed to start: {e}")
+        jobs[job_id].update(status='failed', error=str(e), finished=time.time())
+        return JSONResponse({"message": f"Scraper failed to start: {e}", "job_id": job_id}, 500)
+    if profile:
+        scraper.profiler = RunProfiler('reports', config.get('slow_callback_duration', 0.1))
+    scraper.events.subscribe(progress_listener(jobs[job_id]))
+    current['scraper'] = scraper
+    task = asyncio.create_task(execute_job(job_id, scraper, config))
+    jobs[job_id]['task'] = task
+
+    if request.query_params.get('wait'):
+        await task
+        return JSONResponse({"message": "Scraper executed", "job_id": job_id})
+    return JSONResponse({"message": "Scraper started", "job_id": job_id})
+
+
+def job_info(job_id):
+    job = jobs[job_id]
+    return dict({key: value for key, value in job.items() if key != 'task'}, job_id=job_id)
+
+
+async def job_status(request):
+    job_id = request.path_params['job_id']
+    if job_id not in jobs:
+        return JSONResponse({"message": "Unknown job"}, 404)
+    info = job_info(job_id)
+    if info['status'] == 'running' and current['job_id'] == job_id and current['scraper'] is not None:
+        info['rows'] = len(current['scraper'].data)
+    return JSONResponse(info)
+
+
+async def list_jobs(request):
+    return JSONResponse({"jobs": [job_info(job_id) for job_id in jobs]})
+
+
+async def get_warm_pool():
+    if warm['lock'] is None:
+        warm['lock'] = asyncio.Lock()
+    async with warm['lock']:
+        if warm['pool'] is None:
+            config = await asyncio.to_thread(load_config)
+            # BeautifulSoup must not block the loop serving every client.
+            config['parse_in_thread'] = True
+            pool = WarmPool(config)
+            try:
+                await pool.start()
+            except Exception:
+                await pool.stop()
+                raise
+            warm['pool'] = pool
+    return warm['pool']
+
+
+async def scrape(request):
+    data = await json_body(request)
+    url = data.get('url', '')
+    if not url:
+        return JSONResponse({"message": "No URL provided"}, 400)
+    try:
+        max_age = parse_max_age(data.get('max_age'))
+        pool = await get_warm_pool()
+        # Bounded like the Flask lookup: a stuck page cannot hold the
+        # request open forever.
+        result = await asyncio.wait_for(pool.scrape(url, max_age), pool.lookup_timeout())
+    except ValueError as e:
+        return JSONResponse({"message": str(e)}, 400)
+    except (asyncio.TimeoutError, ScrapeTimeout):
+        return JSONResponse({"message": f"Timed out scraping {url}"}, 504)
+    except ScrapeError as e:
+        return JSONResponse({"message": str(e)}, 502)
+    return JSONResponse(result)
+
+
+async def metrics(request):
+    if current['scraper'] is not None:
+        summary = current['scraper'].metrics.to_dict()
+    else:
+        summary = await asyncio.to_thread(read_metrics)
+    # Fetches shared between jobs and lookups, and the warm pool's own
+    # counters.
+    summary['counters'] = summary.get('counters', []) + flights.counters_summary()
+    if warm['pool'] is not None:
+        summary['counters'] += warm['pool'].counters_summary()
+    return PlainTextResponse(render_prometheus(summary), media_type='text/plain; version=0.0.4')
+
+
+def query_results(args):
+    store = ResultsStore()
+    try:
+        filters = results_filters(store, args)
+        limit = max(1, min(int_arg(args, 'limit', 100), MAX_LIMIT))
+        return store.query(after=int_arg(args, 'after', 0), limit=limit, **filters)
+    finally:
+        store.close()
+
+
+async def results(request):
+    if not os.path.exists('results.db'):
+        return JSONResponse({"message": "No results found"}, 404)
+    items, cursor = await asyncio.to_thread(query_results, dict(request.query_params))
+    return JSONResponse({"results": items, "next": cursor})
+
+
+async def export_results(request):
+    if not os.path.exists('results.db'):
+        return JSONResponse({"message": "No results found"}, 404)
+    export_format = request.query_params.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return JSONResponse({"message": "Unsupported format, use ndjson or csv"}, 400)
+    use_gzip = 'gzip' in request.headers.get('accept-encoding', '')
+    # A plain generator: Starlette iterates it in its thread pool.
+    chunks = export_chunks(ResultsStore(), dict(request.query_params), export_format, use_gzip)
+    headers = {'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'} if use_gzip else None
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return StreamingResponse(chunks, media_type=mimetype, headers=headers)
+
+
+async def runs(request):
+    if not os.path.exists('results.db'):
+        return JSONResponse({"runs": []})
+
+    def load():
+        store = ResultsStore()
+        try:
+            return store.runs(int_arg(request.query_params, 'limit', 50))
+        finally:
+            store.close()
+
+    return JSONResponse({"runs": await asyncio.to_thread(load)})
+
+
+def append_line(filename, line):
+    with open(filename, 'a') as f:
+        f.write(line + '\n')
+
+
+async def report_error(request):
+    error_message = (await json_body(request)).get('error_message', '')
+    if error_message:
+        await asyncio.to_thread(append_line, 'error_log.txt', error_message)
+        return JSONResponse({"message": "Error reported", "error_message": error_message})
+    return JSONResponse({"message": "No error message provided"}, 400)
+
+
+async def request_improvement(request):
+    improvement_request = (await json_body(request)).get('improvement_request', '')
+    if improvement_request:
+        await asyncio.to_thread(append_line, 'improvement_requests.txt', improvement_request)
+        return JSONResponse({"message": "Improvement request submitted", "improvement_request": improvement_request})
+    return JSONResponse({"message": "No improvement request provided"}, 400)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Contexts are warmed at startup so the first /scrape is not cold; a
+    # failed start is retried on the first request.
+    try:
+        await get_warm_pool()
+    except Exception as e:
+        logging.error(f"Error starting warm pool: {e}")
+    yield
+    if warm['pool'] is not None:
+        await warm['pool'].stop()
+
+
+app = Starlette(lifespan=lifespan, routes=[
+    Route('/add_url', add_url, methods=['POST']),
+    Route('/import_urls', import_urls_endpoint, methods=['POST']),
+    Route('/list_urls', list_urls, methods=['GET']),
+    Route('/clear_urls', clear_urls, methods=['DELETE']),
+    Route('/set_proxy', set_proxy, methods=['POST']),
+    Route('/clear_proxy', clear_proxy, methods=['DELETE']),
+    Route('/run_scraper', run_scraper, methods=['POST']),
+    Route('/scrape', scrape, methods=['POST']),
+    Route('/jobs', list_jobs, methods=['GET']),
+    Route('/jobs/{job_id}', job_status, methods=['GET']),
+    Route('/metrics', metrics, methods=['GET']),
+    Route('/results', results, methods=['GET']),
+    Route('/results/export', export_results, methods=['GET']),
+    Route('/runs', runs, methods=['GET']),
+    Route('/report_error', report_error, methods=['POST']),
+    Route('/request_improvement', request_improvement, methods=['POST']),
+])
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=5000, loop='asyncio')
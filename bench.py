@@ -0,0 +1,163 @@
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from fixture_server import FixtureServer
+
+
+def peak_rss_mb(children=False):
+    # None when the platform cannot tell.
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux.
+        who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+    if psutil is not None and not children:
+        # peak_wset on Windows; current RSS where there is no peak.
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1 << 20), 1)
+    return None
+
+
+def scenarios(max_rows):
+    items = [
+        ('static-10', ['/static?rows=10'] * 20, {}),
+        ('static-1k', ['/static?rows=1000'] * 10, {}),
+        ('static-1k-dom', ['/static?rows=1000'] * 10, {'extract_mode': 'dom'}),
+        ('static-100k', ['/static?rows=100000'], {}),
+        ('static-100k-dom', ['/static?rows=100000'], {'extract_mode': 'dom'}),
+        ('js-1k', ['/js?rows=1000'] * 10, {}),
+        ('slow-1s', ['/slow?delay=1&rows=100'] * 8, {}),
+        ('paged-50', [f'/paged?page={page}&pages=50&rows=200' for page in range(1, 51)], {}),
+        ('errors', ['/error?status=500', '/error?status=404', '/missing'] * 5, {}),
+    ]
+    if max_rows >= 1000000:
+        items.append(('static-1m', ['/static?rows=1000000'], {}))
+        items.append(('static-1m-dom', ['/static?rows=1000000'], {'extract_mode': 'dom'}))
+    return items
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+def run_scenario(name, urls, overrides):
+    # Runs in a fresh worker process so peak RSS and CPU are per scenario.
+    from scraper import DynamicContentScraper
+
+    class TimedScraper(DynamicContentScraper):
+        def __init__(self, config):
+            super().__init__(config)
+            self.latencies = []
+
+        async def scrape_in_context(self, browser, url):
+            started = time.perf_counter()
+            try:
+                return await super().scrape_in_context(browser, url)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as profiles_dir:
+        # Scenarios repeat URLs on purpose; each one is a page to fetch.
+        config = dict({'urls': urls, 'profiles_dir': profiles_dir, 'concurrency': 4, 'singleflight': False},
+                      **overrides)
+        scraper = TimedScraper(config)
+        times_before = os.times()
+        started = time.perf_counter()
+        asyncio.run(scraper.run())
+        elapsed = time.perf_counter() - started
+        times_after = os.times()
+
+    pages = len(urls)
+    rows = len(scraper.data)
+    return {
+        'name': name,
+        'pages': pages,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(pages / elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1),
+        'latency_p50': percentile(scraper.latencies, 50),
+        'latency_p95': percentile(scraper.latencies, 95),
+        'latency_p99': percentile(scraper.latencies, 99),
+        'cpu_seconds': round(times_after.user - times_before.user + times_after.system - times_before.system, 3),
+        'children_cpu_seconds': round(
+            times_after.children_user - times_before.children_user
+            + times_after.children_system - times_before.children_system, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'children_peak_rss_mb': peak_rss_mb(children=True),
+    }
+
+
+def compare(results, baseline_file):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {item['name']: item for item in json.load(f)['scenarios']}
+    for item in results:
+        previous = baseline.get(item['name'])
+        if previous and previous['pages_per_second']:
+            change = (item['pages_per_second'] / previous['pages_per_second'] - 1) * 100
+            print(f"{item['name']:<20} {item['pages_per_second']:>10} pages/s ({change:+.1f}% vs baseline)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scraper benchmark against a local fixture server")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--only', nargs='*', help="run only the named scenarios")
+    parser.add_argument('--max-rows', type=int, default=100000, help="include 1M-row pages with --max-rows 1000000")
+    parser.add_argument('--compare', help="previous results file to compare pages/s against")
+    args = parser.parse_args()
+
+    results = []
+    with FixtureServer() as fixtures:
+        for name, paths, overrides in scenarios(args.max_rows):
+            if args.only and name not in args.only:
+                continue
+            urls = [fixtures.url(path) for path in paths]
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_scenario, name, urls, overrides).result()
+            # No latency when no page succeeded, no RSS where the platform
+            # cannot report it.
+            p95 = 'n/a' if result['latency_p95'] is None else f"{result['latency_p95']:.3f}s"
+            rss = 'n/a' if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']} MB"
+            print(f"{name:<20} {result['pages_per_second']:>10} pages/s {result['rows_per_second']:>12} rows/s "
+                  f"p95 {p95} rss {rss}")
+            results.append(result)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scenarios': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"Results saved to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
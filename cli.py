@@ -1,85 +1,132 @@
-import cmd
-import os
-import subprocess
-import json
-
-class ScrapyCmd(cmd.Cmd):
-    intro = 'Welcome to the Scrapy CLI. Type help or ? to list commands.\n'
-    prompt = '(scrapy) '
-
-    def do_add_url(self, arg):
-        'Add a URL to the list for scraping: add_url http://example.com'
-        urls = arg.strip().split()
-        if urls:
-            with open('my_scraper/urls.txt', 'a') as f:
-                for url in urls:
-                    f.write(url + '\n')
-            print(f"URLs added: {', '.join(urls)}")
-        else:
-            print("Please provide at least one URL.")
-
-    def do_list_urls(self, arg):
-        'List all URLs in the list for scraping: list_urls'
-        if os.path.exists('my_scraper/urls.txt'):
-            with open('my_scraper/urls.txt', 'r') as f:
-                urls = f.readlines()
-            if urls:
-                print("URLs for scraping:")
-                for url in urls:
-                    print(url.strip())
-            else:
-                print("No URLs found.")
-        else:
-            print("No URLs found.")
-
-    def do_clear_urls(self, arg):
-        'Clear all URLs from the list: clear_urls'
-        if os.path.exists('my_scraper/urls.txt'):
-            os.remove('my_scraper/urls.txt')
-            print("All URLs cleared.")
-        else:
-            print("No URLs to clear.")
-
-    def do_set_proxy(self, arg):
-        'Set proxy for scraping: set_proxy http://proxyserver:port'
-        proxy = arg.strip()
-        if proxy:
-            with open('my_scraper/proxy.txt', 'w') as f:
-                f.write(proxy)
-            print(f"Proxy set to: {proxy}")
-        else:
-            print("Please provide a proxy URL.")
-
-    def do_clear_proxy(self, arg):
-        'Clear the proxy setting: clear_proxy'
-        if os.path.exists('my_scraper/proxy.txt'):
-            os.remove('my_scraper/proxy.txt')
-            print("Proxy cleared.")
-        else:
-            print("No proxy to clear.")
-
-    def do_run_scraper(self, arg):
-        'Run the scraper: run_scraper'
-        if os.path.exists('my_scraper/urls.txt'):
-            proxy = None
-            if os.path.exists('my_scraper/proxy.txt'):
-                with open('my_scraper/proxy.txt', 'r') as f:
-                    proxy = f.read().strip()
-            command = ['python', 'my_scraper/scraper.py']
-            if proxy:
-                command.append(proxy)
-            subprocess.run(command)
-        else:
-            print("No URLs found. Add URLs before running the scraper.")
-
-    def do_launch_gui(self, arg):
-        'Launch the GUI: launch_gui'
-        subprocess.run(['python', 'my_scraper/gui.py'])
-
-    def do_exit(self, arg):
-        'Exit the Scrapy CLI: exit'
-        print('Thank you for using Scrapy CLI.')
-        return True
-
-if __name__ == '__main__':
-    ScrapyCmd().cmdloop()
+import cmd
+import os
+import subprocess
+import json
+import sys
+
+from events import parse_event, format_progress
+from url_import import import_urls_file
+
+class ScrapyCmd(cmd.Cmd):
+    intro = 'Welcome to the Scrapy CLI. Type help or ? to list commands.\n'
+    prompt = '(scrapy) '
+
+    def do_add_url(self, arg):
+        'Add a URL to the list for scraping: add_url http://example.com'
+        urls = arg.strip().split()
+        if urls:
+            with open('my_scraper/urls.txt', 'a') as f:
+                for url in urls:
+                    f.write(url + '\n')
+            print(f"URLs added: {', '.join(urls)}")
+        else:
+            print("Please provide at least one URL.")
+
+    def do_import_urls(self, arg):
+        'Import URLs from a text, CSV or gzip file: import_urls urls.csv.gz [--format text|csv]'
+        args = arg.strip().split()
+        if not args:
+            print("Please provide a file to import.")
+            return
+        path = args[0]
+        file_format = args[args.index('--format') + 1] if '--format' in args[:-1] else None
+        if not os.path.exists(path):
+            print(f"File not found: {path}")
+            return
+        counts = import_urls_file(path, file_format)
+        print(f"Read {counts['read']} URLs in {counts['seconds']}s: {counts['added']} added, "
+              f"{counts['duplicates']} duplicates, {counts['invalid']} invalid.")
+
+    def do_list_urls(self, arg):
+        'List all URLs in the list for scraping: list_urls'
+        if os.path.exists('my_scraper/urls.txt'):
+            with open('my_scraper/urls.txt', 'r') as f:
+                urls = f.readlines()
+            if urls:
+                print("URLs for scraping:")
+                for url in urls:
+                    print(url.strip())
+            else:
+                print("No URLs found.")
+        else:
+            print("No URLs found.")
+
+    def do_clear_urls(self, arg):
+        'Clear all URLs from the list: clear_urls'
+        if os.path.exists('my_scraper/urls.txt'):
+            os.remove('my_scraper/urls.txt')
+            print("All URLs cleared.")
+        else:
+            print("No URLs to clear.")
+
+    def do_set_proxy(self, arg):
+        'Set one or more proxies for scraping: set_proxy http://proxyserver:port [http://proxy2:port ...]'
+        proxies = arg.strip().split()
+        if proxies:
+            with open('my_scraper/proxy.txt', 'w') as f:
+                for proxy in proxies:
+                    f.write(proxy + '\n')
+            print(f"Proxy set to: {', '.join(proxies)}")
+        else:
+            print("Please provide a proxy URL.")
+
+    def do_clear_proxy(self, arg):
+        'Clear the proxy setting: clear_proxy'
+        if os.path.exists('my_scraper/proxy.txt'):
+            os.remove('my_scraper/proxy.txt')
+            print("Proxy cleared.")
+        else:
+            print("No proxy to clear.")
+
+    def do_run_scraper(self, arg):
+        'Run the scraper: run_scraper [--profile]'
+        if os.path.exists('my_scraper/urls.txt'):
+            proxies = []
+            if os.path.exists('my_scraper/proxy.txt'):
+                with open('my_scraper/proxy.txt', 'r') as f:
+                    proxies = f.read().split()
+            command = ['python', 'my_scraper/scraper.py', '--events']
+            command.extend(proxies)
+            if '--profile' in arg.split():
+                command.append('--profile')
+            # The log would scroll over the live status line, so it goes to
+            # scraper.log while the run is shown here.
+            with open('scraper.log', 'a') as log:
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=log, text=True, encoding='utf-8')
+                for line in process.stdout:
+                    self.show_event(parse_event(line))
+                process.wait()
+            print(f"\nScraper finished (exit code {process.returncode}). Log: scraper.log")
+        else:
+            print("No URLs found. Add URLs before running the scraper.")
+
+    def do_schedule(self, arg):
+        'Run the recurring crawls from config.json "schedules": schedule [--list]'
+        command = ['python', 'my_scraper/scheduler.py']
+        if '--list' in arg.split():
+            command.append('--list')
+        try:
+            subprocess.run(command)
+        except KeyboardInterrupt:
+            print("Scheduler stopped.")
+
+    def show_event(self, event):
+        if event is None:
+            return
+        if event['type'] == 'progress':
+            sys.stdout.write(f"\r{format_progress(event)}\033[K")
+            sys.stdout.flush()
+        elif event['type'] == 'url_failed':
+            sys.stdout.write(f"\rFailed: {event['url']} {event.get('error') or ''}\033[K\n")
+
+    def do_launch_gui(self, arg):
+        'Launch the GUI: launch_gui'
+        subprocess.run(['python', 'my_scraper/gui.py'])
+
+    def do_exit(self, arg):
+        'Exit the Scrapy CLI: exit'
+        print('Thank you for using Scrapy CLI.')
+        return True
+
+if __name__ == '__main__':
+    ScrapyCmd().cmdloop()
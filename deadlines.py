@@ -0,0 +1,81 @@
+
+import asyncio
+import contextvars
+import time
+
+from metrics import DEFAULT_BUCKETS, Histogram
+
+# Deadline of the page the current task is working on; every awaited
+# Playwright call below scrape() takes its timeout from here.
+current_deadline = contextvars.ContextVar('current_deadline', default=None)
+
+
+class Deadline:
+    def __init__(self, seconds=None):
+        self.expires = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self):
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+
+def timeout_ms(default_ms):
+    # Playwright timeout for the next call: what is left of the page
+    # budget, or the default when no deadline is set. 0 would mean "no
+    # timeout" to Playwright, so at least 1 ms.
+    deadline = current_deadline.get()
+    if deadline is None or deadline.expires is None:
+        return default_ms
+    return max(int(deadline.remaining() * 1000), 1)
+
+
+async def within(awaitable):
+    deadline = current_deadline.get()
+    if deadline is None or deadline.expires is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, deadline.remaining())
+
+
+class JobDeadline:
+    # Hands each page a budget that never outlives the job, and stops new
+    # pages from starting once the time left is shorter than a typical page
+    # (the q-th quantile of pages finished so far).
+    def __init__(self, seconds=None, page_budget=None, quantile=0.9, min_samples=5):
+        self.deadline = Deadline(seconds)
+        self.page_budget = page_budget or None
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.durations = Histogram(DEFAULT_BUCKETS)
+        self.skipped = 0
+
+    def remaining(self):
+        return self.deadline.remaining()
+
+    def page_deadline(self):
+        remaining = self.remaining()
+        if remaining is None:
+            return Deadline(self.page_budget)
+        if self.page_budget is None:
+            return Deadline(remaining)
+        return Deadline(min(self.page_budget, remaining))
+
+    def estimate(self):
+        if self.durations.count < self.min_samples:
+            return None
+        return self.durations.quantile(self.quantile)
+
+    def can_start(self):
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        if remaining <= 0:
+            return False
+        estimate = self.estimate()
+        return estimate is None or remaining >= estimate
+
+    def record(self, seconds):
+        self.durations.observe(seconds)
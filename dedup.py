@@ -0,0 +1,124 @@
+
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+
+DEDUP_DEFAULTS = {
+    # Columns that identify a row; empty means the whole row.
+    'keys': [],
+    # Row keys held in memory before they are moved to the on-disk index.
+    'memory_keys': 1000000,
+    'directory': None,
+}
+
+# Keys looked up in the on-disk index per query.
+LOOKUP_BATCH = 500
+
+
+def row_key(values):
+    # 16-byte digest of the key cells; the separators keep ('a b', 'c')
+    # and ('a', 'b c') apart.
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        digest.update(b'\x00' if value is None else b'\x01' + str(value).encode('utf-8', 'replace'))
+        digest.update(b'\x1f')
+    return digest.digest()
+
+
+class RowDeduplicator:
+    # Drops rows already seen on an earlier page (or earlier on the same
+    # page). Keys are kept exactly, in a set until memory_keys is reached,
+    # then in a temporary SQLite index so memory stays bounded however long
+    # the crawl runs.
+    def __init__(self, keys=(), memory_keys=1000000, directory=None):
+        self.keys = list(keys)
+        self.memory_keys = memory_keys
+        self.directory = directory
+        self.seen = set()
+        self.index = None
+        self.index_file = None
+        self.spilled = 0
+        self.rows = 0
+        self.duplicates = 0
+
+    @classmethod
+    def from_config(cls, config):
+        options = config.get('dedup')
+        if not options:
+            return None
+        options = dict(DEDUP_DEFAULTS, **options)
+        return cls(options['keys'], options['memory_keys'], options['directory'])
+
+    def key_positions(self, headers):
+        if not self.keys:
+            return None
+        positions = {name: i for i, name in enumerate(headers)}
+        return [positions.get(name) for name in self.keys]
+
+    def row_keys(self, headers, rows):
+        positions = self.key_positions(headers)
+        for cells in rows:
+            if positions is None:
+                values = cells
+            else:
+                values = [cells[i] if i is not None and i < len(cells) else None for i in positions]
+            values = [value.strip() if isinstance(value, str) else value for value in values]
+            if not any(values):
+                # Nothing to identify the row by: keep it.
+                yield None
+            else:
+                yield row_key(values)
+
+    def spill(self):
+        if self.index is None:
+            fd, self.index_file = tempfile.mkstemp(prefix='dedup-', suffix='.db', dir=self.directory)
+            os.close(fd)
+            self.index = sqlite3.connect(self.index_file, check_same_thread=False)
+            self.index.execute("PRAGMA journal_mode=OFF")
+            self.index.execute("PRAGMA synchronous=OFF")
+            self.index.execute("CREATE TABLE seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        with self.index:
+            self.index.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((key,) for key in self.seen))
+        self.spilled += len(self.seen)
+        logging.info(f"Deduplication index moved to disk ({self.spilled} keys)")
+        self.seen = set()
+
+    def on_disk(self, keys):
+        found = set()
+        keys = list(keys)
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            found.update(key for key, in self.index.execute(
+                f"SELECT key FROM seen WHERE key IN ({placeholders})", batch))
+        return found
+
+    def filter(self, headers, rows):
+        keys = list(self.row_keys(headers, rows))
+        known = ()
+        if self.index is not None:
+            known = self.on_disk({key for key in keys if key is not None and key not in self.seen})
+        kept = []
+        for cells, key in zip(rows, keys):
+            if key is not None:
+                if key in self.seen or key in known:
+                    continue
+                self.seen.add(key)
+            kept.append(cells)
+        self.rows += len(rows)
+        self.duplicates += len(rows) - len(kept)
+        if len(self.seen) >= self.memory_keys:
+            self.spill()
+        return kept
+
+    def stats(self):
+        return {'rows': self.rows, 'duplicates': self.duplicates, 'keys_in_memory': len(self.seen),
+                'keys_on_disk': self.spilled}
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+            os.remove(self.index_file)
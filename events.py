@@ -0,0 +1,96 @@
+
+import json
+import sys
+import time
+
+RUN_STARTED = 'run_started'
+URL_STARTED = 'url_started'
+URL_FINISHED = 'url_finished'
+URL_FAILED = 'url_failed'
+PROGRESS = 'progress'
+RUN_FINISHED = 'run_finished'
+
+
+class EventStream:
+    # Typed progress events from a crawl. With no subscribers every call
+    # returns right away, so the scraper can emit unconditionally.
+    def __init__(self, progress_interval=0.5):
+        self.listeners = []
+        self.progress_interval = progress_interval
+        self.total = 0
+        self.finished = 0
+        self.failed = 0
+        self.rows = 0
+        self.started = None
+        self.last_progress = 0.0
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event_type, **fields):
+        if not self.listeners:
+            return
+        event = dict(fields, type=event_type, ts=round(time.time(), 3))
+        for listener in self.listeners:
+            listener(event)
+
+    def run_started(self, total):
+        self.total = total
+        self.started = time.monotonic()
+        self.emit(RUN_STARTED, total=total)
+
+    def url_started(self, url):
+        self.emit(URL_STARTED, url=url)
+
+    def url_done(self, url, ok, rows, seconds, error=None):
+        if ok:
+            self.finished += 1
+            self.rows += rows
+            self.emit(URL_FINISHED, url=url, rows=rows, seconds=round(seconds, 3))
+        else:
+            self.failed += 1
+            self.emit(URL_FAILED, url=url, error=error, seconds=round(seconds, 3))
+        now = time.monotonic()
+        # Aggregated progress is throttled; per-URL events are not.
+        if now - self.last_progress >= self.progress_interval:
+            self.last_progress = now
+            self.progress()
+
+    def progress(self):
+        if not self.listeners:
+            return
+        elapsed = max(time.monotonic() - (self.started or time.monotonic()), 1e-6)
+        done = self.finished + self.failed
+        self.emit(PROGRESS, total=self.total, done=done, finished=self.finished, failed=self.failed,
+                  rows=self.rows, elapsed=round(elapsed, 3),
+                  pages_per_minute=round(done * 60 / elapsed, 1), rows_per_second=round(self.rows / elapsed, 1))
+
+    def run_finished(self):
+        self.progress()
+        self.emit(RUN_FINISHED, finished=self.finished, failed=self.failed, rows=self.rows)
+
+
+def ndjson_writer(stream=None):
+    stream = stream or sys.stdout
+
+    def write(event):
+        stream.write(json.dumps(event, ensure_ascii=False) + '\n')
+        stream.flush()
+    return write
+
+
+def parse_event(line):
+    # Lines that are not events (stray prints) are ignored.
+    line = line.strip()
+    if not line.startswith('{'):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and 'type' in event else None
+
+
+def format_progress(event):
+    return (f"{event['done']}/{event['total']} pages, {event['failed']} failed, {event['rows']} rows, "
+            f"{event['pages_per_minute']:.1f} pages/min, {event['rows_per_second']:.1f} rows/s")
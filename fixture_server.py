@@ -0,0 +1,118 @@
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+WORDS = ['ООО', 'Ромашка', 'Москва', 'ИНН', '7701234567', 'контакты', 'Acme', 'телефон', '+7 495 000-00-00', 'email']
+
+
+def cell_text(row, col):
+    return f"{WORDS[(row + col) % len(WORDS)]} {row}"
+
+
+def table_chunks(rows, cols, chunk_rows=1000):
+    yield '<table><tr>' + ''.join(f'<th>col{c}</th>' for c in range(cols)) + '</tr>'
+    for start in range(0, rows, chunk_rows):
+        yield ''.join(
+            '<tr>' + ''.join(f'<td>{cell_text(r, c)}</td>' for c in range(cols)) + '</tr>'
+            for r in range(start, min(start + chunk_rows, rows))
+        )
+    yield '</table>'
+
+
+JS_PAGE = """<html><head><meta charset="utf-8"></head><body><div id="app"></div><script>
+setTimeout(function () {
+    var words = %s;
+    var html = ['<table><tr>'];
+    for (var c = 0; c < %d; c++) { html.push('<th>col' + c + '</th>'); }
+    html.push('</tr>');
+    for (var r = 0; r < %d; r++) {
+        html.push('<tr>');
+        for (var c = 0; c < %d; c++) { html.push('<td>' + words[(r + c) %% words.length] + ' ' + r + '</td>'); }
+        html.push('</tr>');
+    }
+    html.push('</table>');
+    document.getElementById('app').innerHTML = html.join('');
+}, %d);
+</script></body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        rows = int(params.get('rows', 10))
+        cols = int(params.get('cols', 5))
+        route = parts.path.strip('/')
+
+        if route == 'static':
+            self.send_table(rows, cols)
+        elif route == 'slow':
+            time.sleep(float(params.get('delay', 1)))
+            self.send_table(rows, cols)
+        elif route == 'paged':
+            page = int(params.get('page', 1))
+            pages = int(params.get('pages', 10))
+            footer = ''
+            if page < pages:
+                footer = f'<a rel="next" href="/paged?page={page + 1}&pages={pages}&rows={rows}&cols={cols}">next</a>'
+            self.send_table(rows, cols, footer)
+        elif route == 'js':
+            body = JS_PAGE % (json.dumps(WORDS, ensure_ascii=False), cols, rows, cols, int(params.get('delay', 50)))
+            self.send_body(body)
+        elif route == 'error':
+            status = int(params.get('status', 500))
+            self.send_body(f'<html><body><h1>Error {status}</h1></body></html>', status)
+        else:
+            self.send_body('<html><body>Not found</body></html>', 404)
+
+    def send_body(self, body, status=200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_table(self, rows, cols, footer=''):
+        # Streamed without Content-Length so million-row pages are never
+        # built in memory; HTTP/1.0 closes the connection at the end.
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(b'<html><head><meta charset="utf-8"></head><body>')
+        for chunk in table_chunks(rows, cols):
+            self.wfile.write(chunk.encode('utf-8'))
+        self.wfile.write((footer + '</body></html>').encode('utf-8'))
+
+
+class FixtureServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    with FixtureServer(port=8765) as fixtures:
+        print(f"Serving fixtures on {fixtures.url('/')}")
+        fixtures.thread.join()
@@ -0,0 +1,208 @@
+
+import asyncio
+import ctypes
+import gc
+import logging
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+GOVERNOR_DEFAULTS = {
+    'interval': 5.0,
+    # Budgets in MB; 0 disables the check.
+    'python_rss_mb': 0,
+    'browser_rss_mb': 0,
+    'pause_rss_mb': 0,
+    'min_available_mb': 0,
+    # Recycle the browser after this many pages even within budget.
+    'browser_max_pages': 0,
+    # A fresh browser serves at least this many pages before it can be
+    # recycled again, so a tight budget cannot make it thrash.
+    'min_pages_between_recycles': 20,
+}
+
+MB = 1024 * 1024
+
+
+def process_rss(pid=None):
+    if psutil is not None:
+        return psutil.Process(pid).memory_info().rss
+    with open(f"/proc/{pid or 'self'}/statm", 'r') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def children_by_parent():
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                # The command name is in parentheses and may contain spaces.
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def child_pids(pid=None):
+    pid = pid or os.getpid()
+    if psutil is not None:
+        return [child.pid for child in psutil.Process(pid).children()]
+    return children_by_parent().get(pid, [])
+
+
+def descendants(pid=None):
+    pid = pid or os.getpid()
+    if psutil is not None:
+        return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+    children = children_by_parent()
+    found = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def tree_rss(pids):
+    # The given processes (a scraper's Playwright driver) and everything
+    # they started: that scraper's browsers, not those of other jobs or the
+    # warm pool in the same server.
+    total = 0
+    for root in pids:
+        try:
+            members = [root] + descendants(root)
+        except Exception:
+            continue
+        for pid in members:
+            try:
+                total += process_rss(pid)
+            except Exception:
+                continue
+    return total
+
+
+def available_memory():
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    with open('/proc/meminfo', 'r') as f:
+        for line in f:
+            if line.startswith('MemAvailable:'):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def release_heap():
+    gc.collect()
+    try:
+        # Hands freed arenas back to the OS (glibc only).
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ResourceGovernor:
+    def __init__(self, interval=5.0, python_rss_mb=0, browser_rss_mb=0, pause_rss_mb=0, min_available_mb=0,
+                 browser_max_pages=0, min_pages_between_recycles=20):
+        self.interval = interval
+        self.python_budget = python_rss_mb * MB
+        self.browser_budget = browser_rss_mb * MB
+        self.pause_budget = pause_rss_mb * MB
+        self.min_available = min_available_mb * MB
+        self.browser_max_pages = browser_max_pages
+        self.min_pages_between_recycles = min_pages_between_recycles
+        self.recycle_requested = False
+        self.resumed = asyncio.Event()
+        self.resumed.set()
+        self.sample = {}
+        self.pauses = 0
+        self.heap_releases = 0
+
+    @classmethod
+    def from_config(cls, config):
+        options = config.get('governor')
+        if not options:
+            return None
+        options = dict(GOVERNOR_DEFAULTS, **options)
+        return cls(**options)
+
+    @property
+    def paused(self):
+        return not self.resumed.is_set()
+
+    def should_recycle(self, browser_pages):
+        if browser_pages < self.min_pages_between_recycles:
+            return False
+        if self.browser_max_pages and browser_pages >= self.browser_max_pages:
+            return True
+        return self.recycle_requested
+
+    def recycled(self):
+        self.recycle_requested = False
+
+    async def wait_for_capacity(self):
+        await self.resumed.wait()
+
+    def measure(self, browser_pids=()):
+        python_rss = process_rss()
+        browser_rss = tree_rss(browser_pids)
+        return {
+            'python_rss': python_rss,
+            'browser_rss': browser_rss,
+            'total_rss': python_rss + browser_rss,
+            'available': available_memory(),
+        }
+
+    def under_pressure(self, sample, margin=1.0):
+        if self.pause_budget and sample['total_rss'] > self.pause_budget * margin:
+            return True
+        available = sample['available']
+        return bool(self.min_available and available is not None and available < self.min_available / margin)
+
+    def check(self, sample, in_flight):
+        self.sample = sample
+        if self.python_budget and sample['python_rss'] > self.python_budget:
+            # The interpreter cannot be swapped mid-run; collect and trim
+            # instead, and let the pressure check below stop intake if the
+            # heap stays large.
+            release_heap()
+            self.heap_releases += 1
+            sample['python_rss'] = process_rss()
+            sample['total_rss'] = sample['python_rss'] + sample['browser_rss']
+        if self.browser_budget and sample['browser_rss'] > self.browser_budget and not self.recycle_requested:
+            logging.warning(f"Browser RSS {sample['browser_rss'] // MB} MB over budget, recycling")
+            self.recycle_requested = True
+
+        if not self.paused and self.under_pressure(sample):
+            logging.warning(f"Memory pressure (RSS {sample['total_rss'] // MB} MB), pausing intake")
+            self.resumed.clear()
+            self.pauses += 1
+            self.recycle_requested = True
+        elif self.paused and not self.under_pressure(sample, margin=0.9):
+            logging.info("Memory pressure cleared, resuming intake")
+            self.resumed.set()
+        elif self.paused and in_flight == 0:
+            # Nothing left to finish and memory is still high: waiting will
+            # not help, so keep crawling rather than stall forever.
+            logging.warning(f"Memory still high with no pages in flight (RSS {sample['total_rss'] // MB} MB), resuming")
+            self.resumed.set()
+
+    async def run(self, in_flight, browser_pids=()):
+        while True:
+            try:
+                sample = await asyncio.to_thread(self.measure, browser_pids)
+                self.check(sample, in_flight())
+            except Exception as e:
+                logging.error(f"Error sampling memory: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self):
+        stats = {key: value // MB for key, value in self.sample.items() if value is not None}
+        stats.update(pauses=self.pauses, heap_releases=self.heap_releases)
+        return stats
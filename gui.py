@@ -1,322 +1,559 @@
-import tkinter as tk
-from tkinter import ttk, Text, messagebox, filedialog
-import subprocess
-import threading
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import os
-import logging
-import json
-import requests
-
-logging.basicConfig(level=logging.INFO)
-
-class ScrapyGUI(tk.Tk):
-    def __init__(self):
-        super().__init__()
-
-        self.title("Scrapy GUI with Chat API")
-        self.geometry("1200x900")
-        self.configure(bg='#e6f7ff')
-
-        self.api_url = "http://127.0.0.1:5000"  # URL для доступа к API
-
-        self.config = self.load_config()
-        self.urls = self.config.get('urls', [])
-        self.proxy = self.config.get('proxy', "")
-        self.timeout = self.config.get('timeout', 120000)
-
-        self.create_widgets()
-
-    def load_config(self):
-        if os.path.exists('config.json'):
-            with open('config.json', 'r') as f:
-                return json.load(f)
-        else:
-            return {}
-
-    def save_config(self):
-        self.config['urls'] = self.urls
-        self.config['proxy'] = self.proxy
-        self.config['timeout'] = self.timeout
-        with open('config.json', 'w') as f:
-            json.dump(self.config, f, ensure_ascii=False, indent=4)
-
-    def create_widgets(self):
-        style = ttk.Style(self)
-        style.configure('TButton', font=('Helvetica', 12), padding=10)
-        style.configure('TLabel', font=('Helvetica', 12), padding=10)
-        style.configure('TEntry', font=('Helvetica', 12), padding=10)
-
-        self.notebook = ttk.Notebook(self)
-        self.notebook.pack(pady=10, fill=tk.BOTH, expand=True)
-
-        self.url_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.url_frame, text="URL", compound=tk.LEFT)
-
-        self.url_label = ttk.Label(self.url_frame, text="Enter URL for scraping:")
-        self.url_label.pack(pady=10)
-        self.url_entry = ttk.Entry(self.url_frame, width=70)
-        self.url_entry.pack(pady=5)
-        self.add_url_button = ttk.Button(self.url_frame, text="Add URL", command=self.add_url)
-        self.add_url_button.pack(pady=5)
-        self.url_listbox = tk.Listbox(self.url_frame, width=100, height=10)
-        self.url_listbox.pack(pady=10)
-        self.remove_url_button = ttk.Button(self.url_frame, text="Remove selected URL", command=self.remove_url)
-        self.remove_url_button.pack(pady=5)
-        self.update_url_listbox()
-
-        self.proxy_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.proxy_frame, text="Proxy", compound=tk.LEFT)
-        self.proxy_label = ttk.Label(self.proxy_frame, text="Enter proxy (optional):")
-        self.proxy_label.pack(pady=10)
-        self.proxy_entry = ttk.Entry(self.proxy_frame, width=70)
-        self.proxy_entry.pack(pady=5)
-        self.set_proxy_button = ttk.Button(self.proxy_frame, text="Set Proxy", command=self.set_proxy)
-        self.set_proxy_button.pack(pady=5)
-
-        self.settings_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.settings_frame, text="Settings", compound=tk.LEFT)
-        self.timeout_label = ttk.Label(self.settings_frame, text="Set timeout (milliseconds):")
-        self.timeout_label.pack(pady=10)
-        self.timeout_entry = ttk.Entry(self.settings_frame, width=70)
-        self.timeout_entry.pack(pady=5)
-        self.set_timeout_button = ttk.Button(self.settings_frame, text="Set Timeout", command=self.set_timeout)
-        self.set_timeout_button.pack(pady=5)
-
-        self.run_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.run_frame, text="Run", compound=tk.LEFT)
-        self.run_button = ttk.Button(self.run_frame, text="Run scraper", command=self.run_scraper_thread)
-        self.run_button.pack(pady=10)
-
-        self.results_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.results_frame, text="Results", compound=tk.LEFT)
-        self.results_text = Text(self.results_frame, height=10, width=100, wrap=tk.WORD, bg='#ffffff')
-        self.results_text.pack(pady=10)
-        self.save_button = ttk.Button(self.results_frame, text="Save results", command=self.save_results)
-        self.save_button.pack(pady=10)
-        self.figure_frame = ttk.Frame(self.results_frame)
-        self.figure_frame.pack(pady=10, fill=tk.BOTH, expand=True)
-
-        self.progress_frame = ttk.Frame(self)
-        self.progress_frame.pack(pady=10, fill=tk.X)
-        self.progress_label = ttk.Label(self.progress_frame, text="Progress:")
-        self.progress_label.pack(side=tk.LEFT, padx=10)
-        self.progress_bar = ttk.Progressbar(self.progress_frame, orient='horizontal', mode='determinate', length=300)
-        self.progress_bar.pack(side=tk.LEFT, padx=10)
-
-        self.history_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.history_frame, text="History", compound=tk.LEFT)
-        self.history_text = Text(self.history_frame, height=10, width=100, wrap=tk.WORD, bg='#ffffff')
-        self.history_text.pack(pady=10)
-
-        self.chat_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.chat_frame, text="Chat", compound=tk.LEFT)
-        self.chat_display = Text(self.chat_frame, height=20, width=100, wrap=tk.WORD, bg='#ffffff')
-        self.chat_display.pack(pady=10)
-        self.chat_input = ttk.Entry(self.chat_frame, width=100)
-        self.chat_input.pack(pady=5)
-        self.send_button = ttk.Button(self.chat_frame, text="Send", command=self.send_chat_message)
-        self.send_button.pack(pady=5)
-
-    def update_url_listbox(self):
-        self.url_listbox.delete(0, tk.END)
-        for url in self.urls:
-            self.url_listbox.insert(tk.END, url)
-
-    def add_url(self):
-        url = self.url_entry.get()
-        if url:
-            self.urls.append(url)
-            self.update_url_listbox()
-            self.url_entry.delete(0, tk.END)
-            self.save_config()
-        else:
-            messagebox.showwarning("Warning", "Please enter a URL to add.")
-
-    def remove_url(self):
-        selected_indices = self.url_listbox.curselection()
-        if selected_indices:
-            for index in selected_indices[::-1]:
-                self.urls.pop(index)
-                self.update_url_listbox()
-            self.save_config()
-        else:
-            messagebox.showwarning("Warning", "Please select a URL to remove.")
-
-    def set_proxy(self):
-        self.proxy = self.proxy_entry.get()
-        messagebox.showinfo("Info", f"Proxy set to: {self.proxy}")
-        self.save_config()
-
-    def set_timeout(self):
-        try:
-            self.timeout = int(self.timeout_entry.get())
-            messagebox.showinfo("Info", f"Timeout set to: {self.timeout} milliseconds")
-            self.save_config()
-        except ValueError:
-            messagebox.showwarning("Warning", "Please enter a valid number for the timeout.")
-
-    def run_scraper(self):
-        if self.urls:
-            with open('config.json', 'w') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=4)
-
-            try:
-                command = ['python', 'my_scraper/scraper.py']
-                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-                for line in process.stdout:
-                    self.update_progress(line)
-
-                process.wait()
-
-                self.results_text.delete('1.0', tk.END)
-                if os.path.exists('output.csv'):
-                    try:
-                        with open('output.csv', 'r') as file:
-                            self.results_text.insert(tk.END, file.read())
-                        self.after(0, self.visualize_data)
-                    except pd.errors.EmptyDataError:
-                        self.results_text.insert(tk.END, "File output.csv is empty. Check the URL and try again.")
-                    except Exception as e:
-                        self.results_text.insert(tk.END, f"Error loading file: {e}")
-                        logging.error(f"Error loading file: {e}")
-                else:
-                    self.results_text.insert(tk.END, "File output.csv not found. Check the scraper execution.")
-            except Exception as e:
-                logging.error(f"Error executing scraper: {e}")
-                messagebox.showerror("Error", f"Error executing scraper: {e}")
-
-            self.update_history()
-
-    def run_scraper_thread(self):
-        threading.Thread(target=self.run_scraper).start()
-
-    def update_progress(self, line):
-        if 'Found items:' in line:
-            parts = line.strip().split(':')
-            if len(parts) == 2 and parts[1].isdigit():
-                found_items = int(parts[1])
-                self.progress_bar['value'] = found_items
-                self.progress_label.config(text=f"Progress: {found_items} items found")
-
-    def save_results(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
-        if file_path:
-            with open('output.csv', 'r') as file:
-                content = file.read()
-                with open(file_path, 'w') as save_file:
-                    save_file.write(content)
-            messagebox.showinfo("Information", "Results saved.")
-
-    def visualize_data(self):
-        try:
-            df = pd.read_csv('output.csv')
-            if df.empty:
-                raise ValueError("No data to visualize.")
-
-            fig, ax = plt.subplots(figsize=(10, 6))
-            df.plot(kind='bar', ax=ax)
-            ax.set_title('Data Visualization from output.csv')
-
-            for widget in self.figure_frame.winfo_children():
-                widget.destroy()
-
-            canvas = FigureCanvasTkAgg(fig, master=self.figure_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        except Exception as e:
-            logging.error(f"Error visualizing data: {e}")
-            messagebox.showerror("Error", f"Error visualizing data: {e}")
-
-    def update_history(self):
-        if os.path.exists('history.txt'):
-            with open('history.txt', 'r') as file:
-                history = file.read()
-        else:
-            history = "Task history:\n"
-
-        with open('history.txt', 'w') as file:
-            file.write(history + f"\nTask completed. Items found: {self.progress_bar['value']}")
-
-        self.history_text.delete('1.0', tk.END)
-        self.history_text.insert(tk.END, history)
-
-    def send_chat_message(self):
-        message = self.chat_input.get()
-        if message:
-            self.chat_display.insert(tk.END, f"You: {message}\n")
-            self.chat_input.delete(0, tk.END)
-            self.process_chat_message(message)
-        else:
-            messagebox.showwarning("Warning", "Please enter a message to send.")
-
-    def process_chat_message(self, message):
-        # Обработка сообщения и отправка запросов к API
-        if message.startswith("add_url"):
-            urls = message.split()[1:]
-            if urls:
-                response = requests.post(f"{self.api_url}/add_url", json={"urls": urls})
-                if response.status_code == 200:
-                    self.chat_display.insert(tk.END, f"Bot: URLs added: {', '.join(urls)}\n")
-                else:
-                    self.chat_display.insert(tk.END, f"Bot: Failed to add URLs. {response.json().get('message')}\n")
-            else:
-                self.chat_display.insert(tk.END, "Bot: Please provide at least one URL.\n")
-        elif message.startswith("list_urls"):
-            response = requests.get(f"{self.api_url}/list_urls")
-            if response.status_code == 200:
-                urls = response.json().get("urls", [])
-                if urls:
-                    self.chat_display.insert(tk.END, f"Bot: URLs for scraping:\n" + "\n".join(urls) + "\n")
-                else:
-                    self.chat_display.insert(tk.END, "Bot: No URLs found.\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to list URLs. {response.json().get('message')}\n")
-        elif message.startswith("clear_urls"):
-            response = requests.delete(f"{self.api_url}/clear_urls")
-            if response.status_code == 200:
-                self.chat_display.insert(tk.END, "Bot: All URLs cleared.\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to clear URLs. {response.json().get('message')}\n")
-        elif message.startswith("set_proxy"):
-            proxy = message.split()[1]
-            response = requests.post(f"{self.api_url}/set_proxy", json={"proxy": proxy})
-            if response.status_code == 200:
-                self.chat_display.insert(tk.END, f"Bot: Proxy set to: {proxy}\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to set proxy. {response.json().get('message')}\n")
-        elif message.startswith("clear_proxy"):
-            response = requests.delete(f"{self.api_url}/clear_proxy")
-            if response.status_code == 200:
-                self.chat_display.insert(tk.END, "Bot: Proxy cleared.\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to clear proxy. {response.json().get('message')}\n")
-        elif message.startswith("run_scraper"):
-            response = requests.post(f"{self.api_url}/run_scraper")
-            if response.status_code == 200:
-                self.chat_display.insert(tk.END, "Bot: Scraper executed.\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to run scraper. {response.json().get('message')}\n")
-        elif message.startswith("report_error"):
-            error_message = " ".join(message.split()[1:])
-            response = requests.post(f"{self.api_url}/report_error", json={"error_message": error_message})
-            if response.status_code == 200:
-                self.chat_display.insert(tk.END, "Bot: Error reported.\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to report error. {response.json().get('message')}\n")
-        elif message.startswith("request_improvement"):
-            improvement_request = " ".join(message.split()[1:])
-            response = requests.post(f"{self.api_url}/request_improvement", json={"improvement_request": improvement_request})
-            if response.status_code == 200:
-                self.chat_display.insert(tk.END, "Bot: Improvement request submitted.\n")
-            else:
-                self.chat_display.insert(tk.END, f"Bot: Failed to submit improvement request. {response.json().get('message')}\n")
-        else:
-            self.chat_display.insert(tk.END, "Bot: Unknown command. Please try again.\n")
-
-if __name__ == '__main__':
-    app = ScrapyGUI()
-    app.mainloop()
+import tkinter as tk
+from tkinter import ttk, Text, messagebox, filedialog
+import subprocess
+import threading
+import queue
+import shutil
+from collections import OrderedDict
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import os
+import logging
+import json
+import requests
+from events import parse_event, format_progress
+from output_files import AppendLog
+from results_db import ResultsStore
+
+logging.basicConfig(level=logging.INFO)
+
+history_log = AppendLog('history.txt')
+
+class ResultsGrid(ttk.Frame):
+    # Virtualized view of the latest run in results.db: the Treeview only
+    # holds the rows that fit on screen. Pages are read by a background
+    # thread and handed back to the Tk thread through a queue.
+    def __init__(self, master, page_size=200, cached_pages=20, **kwargs):
+        super().__init__(master, **kwargs)
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self.tree = ttk.Treeview(self, show='headings', selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.xscrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.xscrollbar.set)
+        self.xscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_rows(-3 if event.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll_rows(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_rows(3))
+        self.tree.bind('<Configure>', lambda event: self.render())
+
+        self.requests = queue.Queue()
+        self.responses = queue.Queue()
+        self.pages = OrderedDict()
+        self.requested = set()
+        self.generation = 0
+        self.search = None
+        self.run_id = None
+        self.total = 0
+        self.offset = 0
+        self.columns = []
+        self.on_loaded = None
+        threading.Thread(target=self.worker, daemon=True).start()
+        self.poll()
+
+    def load(self, search=None):
+        self.generation += 1
+        self.search = search
+        self.pages.clear()
+        self.requested = set()
+        self.offset = 0
+        self.requests.put((self.generation, search, [0]))
+
+    def visible_rows(self):
+        # Default ttk row height is about 20 px.
+        return max(self.tree.winfo_height() // 20, 1)
+
+    def scroll_rows(self, rows):
+        self.offset = max(0, min(self.offset + rows, self.total - self.visible_rows()))
+        self.render()
+
+    def on_scroll(self, action, value, unit=None):
+        if action == 'moveto':
+            self.offset = int(float(value) * self.total)
+            self.scroll_rows(0)
+        else:
+            self.scroll_rows(int(value) * (self.visible_rows() if unit == 'pages' else 1))
+
+    def render(self):
+        visible = self.visible_rows()
+        first = self.offset // self.page_size
+        last = min(self.offset + visible, max(self.total, 1) - 1) // self.page_size
+        needed = set(range(first, last + 1))
+        missing = needed - set(self.pages)
+        if missing and missing != self.requested:
+            # Only the latest request matters; the worker drops older ones.
+            self.requested = missing
+            self.requests.put((self.generation, self.search, sorted(missing)))
+
+        self.tree.delete(*self.tree.get_children())
+        for position in range(self.offset, min(self.offset + visible, self.total)):
+            page = self.pages.get(position // self.page_size)
+            if page is None:
+                break
+            index = position - (position // self.page_size) * self.page_size
+            if index < len(page):
+                data = page[index]['data']
+                self.tree.insert('', tk.END, values=[data.get(column, '') for column in self.columns])
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, min((self.offset + visible) / self.total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def worker(self):
+        store = None
+        generation = None
+        run_id = None
+        while True:
+            request = self.requests.get()
+            while not self.requests.empty():
+                request = self.requests.get_nowait()
+            request_generation, search, pages = request
+            try:
+                if store is None:
+                    store = ResultsStore()
+                if request_generation != generation:
+                    generation = request_generation
+                    run_id = store.latest_run()
+                    total = store.count(run_id=run_id, search=search)
+                    items, _ = store.query(run_id=run_id, search=search, limit=1)
+                    columns = list(items[0]['data']) if items else []
+                    self.responses.put(('reset', generation, run_id, total, columns))
+                for page in pages:
+                    items, _ = store.query(run_id=run_id, search=search, offset=page * self.page_size,
+                                           limit=self.page_size)
+                    self.responses.put(('page', generation, page, items))
+            except Exception as e:
+                logging.error(f"Error loading results: {e}")
+                self.responses.put(('error', request_generation, str(e)))
+
+    def poll(self):
+        changed = False
+        while not self.responses.empty():
+            response = self.responses.get_nowait()
+            if response[1] != self.generation:
+                continue
+            if response[0] == 'reset':
+                _, _, self.run_id, self.total, columns = response
+                if columns != self.columns:
+                    self.columns = columns
+                    self.tree.configure(columns=columns)
+                    for column in columns:
+                        self.tree.heading(column, text=column)
+                        self.tree.column(column, width=150, stretch=False)
+                if self.on_loaded:
+                    self.on_loaded(self.run_id, self.total, self.columns)
+            elif response[0] == 'page':
+                _, _, page, items = response
+                self.pages[page] = items
+                self.requested.discard(page)
+                while len(self.pages) > self.cached_pages:
+                    self.pages.popitem(last=False)
+            else:
+                logging.error(f"Results grid: {response[2]}")
+            changed = True
+        if changed:
+            self.render()
+        self.after(50, self.poll)
+
+class ScrapyGUI(tk.Tk):
+    def __init__(self):
+        super().__init__()
+
+        self.title("Scrapy GUI with Chat API")
+        self.geometry("1200x900")
+        self.configure(bg='#e6f7ff')
+
+        self.api_url = "http://127.0.0.1:5000"  # URL для доступа к API
+
+        self.config = self.load_config()
+        self.urls = self.config.get('urls', [])
+        self.proxy = self.config.get('proxy', "")
+        self.proxies = self.config.get('proxies', [])
+        self.timeout = self.config.get('timeout', 120000)
+
+        self.events = queue.Queue()
+        self.rows_found = 0
+
+        self.create_widgets()
+        self.poll_events()
+
+    def load_config(self):
+        if os.path.exists('config.json'):
+            with open('config.json', 'r') as f:
+                return json.load(f)
+        else:
+            return {}
+
+    def save_config(self):
+        self.config['urls'] = self.urls
+        self.config['proxy'] = self.proxy
+        self.config['proxies'] = self.proxies
+        self.config['timeout'] = self.timeout
+        with open('config.json', 'w') as f:
+            json.dump(self.config, f, ensure_ascii=False, indent=4)
+
+    def create_widgets(self):
+        style = ttk.Style(self)
+        style.configure('TButton', font=('Helvetica', 12), padding=10)
+        style.configure('TLabel', font=('Helvetica', 12), padding=10)
+        style.configure('TEntry', font=('Helvetica', 12), padding=10)
+
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(pady=10, fill=tk.BOTH, expand=True)
+
+        self.url_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.url_frame, text="URL", compound=tk.LEFT)
+
+        self.url_label = ttk.Label(self.url_frame, text="Enter URL for scraping:")
+        self.url_label.pack(pady=10)
+        self.url_entry = ttk.Entry(self.url_frame, width=70)
+        self.url_entry.pack(pady=5)
+        self.add_url_button = ttk.Button(self.url_frame, text="Add URL", command=self.add_url)
+        self.add_url_button.pack(pady=5)
+        self.url_listbox = tk.Listbox(self.url_frame, width=100, height=10)
+        self.url_listbox.pack(pady=10)
+        self.remove_url_button = ttk.Button(self.url_frame, text="Remove selected URL", command=self.remove_url)
+        self.remove_url_button.pack(pady=5)
+        self.update_url_listbox()
+
+        self.proxy_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.proxy_frame, text="Proxy", compound=tk.LEFT)
+        self.proxy_label = ttk.Label(self.proxy_frame, text="Enter proxies separated by spaces (optional):")
+        self.proxy_label.pack(pady=10)
+        self.proxy_entry = ttk.Entry(self.proxy_frame, width=70)
+        self.proxy_entry.pack(pady=5)
+        self.set_proxy_button = ttk.Button(self.proxy_frame, text="Set Proxy", command=self.set_proxy)
+        self.set_proxy_button.pack(pady=5)
+
+        self.settings_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.settings_frame, text="Settings", compound=tk.LEFT)
+        self.timeout_label = ttk.Label(self.settings_frame, text="Set timeout (milliseconds):")
+        self.timeout_label.pack(pady=10)
+        self.timeout_entry = ttk.Entry(self.settings_frame, width=70)
+        self.timeout_entry.pack(pady=5)
+        self.set_timeout_button = ttk.Button(self.settings_frame, text="Set Timeout", command=self.set_timeout)
+        self.set_timeout_button.pack(pady=5)
+
+        self.run_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.run_frame, text="Run", compound=tk.LEFT)
+        self.run_button = ttk.Button(self.run_frame, text="Run scraper", command=self.run_scraper_thread)
+        self.run_button.pack(pady=10)
+
+        self.results_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.results_frame, text="Results", compound=tk.LEFT)
+        self.search_frame = ttk.Frame(self.results_frame)
+        self.search_frame.pack(pady=5)
+        self.search_entry = ttk.Entry(self.search_frame, width=50)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_button = ttk.Button(self.search_frame, text="Search", command=self.search_results)
+        self.search_button.pack(side=tk.LEFT, padx=5)
+        self.chart_column = ttk.Combobox(self.search_frame, width=25, state='readonly')
+        self.chart_column.pack(side=tk.LEFT, padx=5)
+        self.chart_button = ttk.Button(self.search_frame, text="Chart", command=self.visualize_data)
+        self.chart_button.pack(side=tk.LEFT, padx=5)
+        self.results_info = ttk.Label(self.results_frame, text="No results loaded.")
+        self.results_info.pack()
+        self.results_grid = ResultsGrid(self.results_frame)
+        self.results_grid.pack(pady=10, fill=tk.BOTH, expand=True)
+        self.results_grid.on_loaded = self.results_loaded
+        self.save_button = ttk.Button(self.results_frame, text="Save results", command=self.save_results)
+        self.save_button.pack(pady=10)
+        self.chart_figure = None
+        self.figure_frame = ttk.Frame(self.results_frame)
+        self.figure_frame.pack(pady=10, fill=tk.BOTH, expand=True)
+
+        self.progress_frame = ttk.Frame(self)
+        self.progress_frame.pack(pady=10, fill=tk.X)
+        self.progress_label = ttk.Label(self.progress_frame, text="Progress:")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, orient='horizontal', mode='determinate', length=300)
+        self.progress_bar.pack(side=tk.LEFT, padx=10)
+
+        self.history_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.history_frame, text="History", compound=tk.LEFT)
+        self.history_text = Text(self.history_frame, height=10, width=100, wrap=tk.WORD, bg='#ffffff')
+        self.history_text.pack(pady=10)
+        self.load_history()
+
+        self.chat_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.chat_frame, text="Chat", compound=tk.LEFT)
+        self.chat_display = Text(self.chat_frame, height=20, width=100, wrap=tk.WORD, bg='#ffffff')
+        self.chat_display.pack(pady=10)
+        self.chat_input = ttk.Entry(self.chat_frame, width=100)
+        self.chat_input.pack(pady=5)
+        self.send_button = ttk.Button(self.chat_frame, text="Send", command=self.send_chat_message)
+        self.send_button.pack(pady=5)
+
+    def update_url_listbox(self):
+        self.url_listbox.delete(0, tk.END)
+        for url in self.urls:
+            self.url_listbox.insert(tk.END, url)
+
+    def add_url(self):
+        url = self.url_entry.get()
+        if url:
+            self.urls.append(url)
+            self.update_url_listbox()
+            self.url_entry.delete(0, tk.END)
+            self.save_config()
+        else:
+            messagebox.showwarning("Warning", "Please enter a URL to add.")
+
+    def remove_url(self):
+        selected_indices = self.url_listbox.curselection()
+        if selected_indices:
+            for index in selected_indices[::-1]:
+                self.urls.pop(index)
+                self.update_url_listbox()
+            self.save_config()
+        else:
+            messagebox.showwarning("Warning", "Please select a URL to remove.")
+
+    def set_proxy(self):
+        self.proxies = self.proxy_entry.get().split()
+        self.proxy = self.proxies[0] if self.proxies else ""
+        messagebox.showinfo("Info", f"Proxy set to: {', '.join(self.proxies)}")
+        self.save_config()
+
+    def set_timeout(self):
+        try:
+            self.timeout = int(self.timeout_entry.get())
+            messagebox.showinfo("Info", f"Timeout set to: {self.timeout} milliseconds")
+            self.save_config()
+        except ValueError:
+            messagebox.showwarning("Warning", "Please enter a valid number for the timeout.")
+
+    def run_scraper(self):
+        # Runs on a worker thread and never touches widgets: everything it
+        # learns goes through self.events to poll_events on the Tk loop.
+        if self.urls:
+            with open('config.json', 'w') as f:
+                json.dump(self.config, f, ensure_ascii=False, indent=4)
+
+            try:
+                command = ['python', 'my_scraper/scraper.py', '--events']
+                # The log goes to stderr; it is left on the terminal instead of
+                # an unread pipe that would block the scraper once full.
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+
+                for line in process.stdout:
+                    event = parse_event(line)
+                    if event:
+                        self.events.put(event)
+
+                process.wait()
+                self.events.put({'type': 'process_exit', 'returncode': process.returncode})
+            except Exception as e:
+                logging.error(f"Error executing scraper: {e}")
+                self.events.put({'type': 'process_error', 'error': str(e)})
+
+    def load_results(self):
+        if os.path.exists('results.db'):
+            self.results_info.config(text="Loading results...")
+            self.results_grid.load(self.search_entry.get().strip() or None)
+        else:
+            self.results_info.config(text="Results database results.db not found. Check the scraper execution.")
+
+    def results_loaded(self, run_id, total, columns):
+        if not total:
+            self.results_info.config(text="No results found. Check the URL and try again.")
+        else:
+            self.results_info.config(text=f"Run {run_id}: {total} rows")
+        self.chart_column['values'] = columns
+        if columns and self.chart_column.get() not in columns:
+            self.chart_column.set(columns[0])
+        if total:
+            self.visualize_data()
+
+    def search_results(self):
+        self.load_results()
+
+    def run_scraper_thread(self):
+        threading.Thread(target=self.run_scraper).start()
+
+    def poll_events(self, limit=1000):
+        # Drains whatever arrived since the last tick; only the newest
+        # progress event is rendered, so bursts cost one widget update.
+        progress = None
+        failures = []
+        finished = False
+        for _ in range(limit):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event['type'] == 'run_started':
+                self.progress_bar['maximum'] = max(event['total'], 1)
+                self.progress_bar['value'] = 0
+                self.rows_found = 0
+            elif event['type'] == 'progress':
+                progress = event
+            elif event['type'] == 'url_failed':
+                failures.append(event)
+            elif event['type'] == 'process_exit':
+                finished = True
+            elif event['type'] == 'process_error':
+                messagebox.showerror("Error", f"Error executing scraper: {event['error']}")
+            elif event['type'] == 'chart':
+                self.draw_chart(event['column'], event['counts'])
+        if progress:
+            self.progress_bar['value'] = progress['done']
+            self.rows_found = progress['rows']
+            self.progress_label.config(text=f"Progress: {format_progress(progress)}")
+        for event in failures:
+            self.history_text.insert(tk.END, f"Failed: {event['url']} {event.get('error') or ''}\n")
+        if finished:
+            self.load_results()
+            self.update_history()
+        self.after(100, self.poll_events)
+
+    def save_results(self):
+        if not os.path.exists('output.csv'):
+            messagebox.showwarning("Warning", "No CSV results found. Add 'csv' to output_formats and run the scraper.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if file_path:
+            try:
+                shutil.copyfile('output.csv', file_path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Error saving results: {e}")
+                return
+            messagebox.showinfo("Information", "Results saved.")
+
+    def visualize_data(self, top=20):
+        # Top values of one column, counted in SQLite on a worker thread;
+        # only the aggregate reaches matplotlib.
+        column = self.chart_column.get()
+        if not column:
+            messagebox.showwarning("Warning", "Load results and pick a column to chart.")
+            return
+        run_id = self.results_grid.run_id
+        search = self.results_grid.search
+
+        def aggregate():
+            store = ResultsStore()
+            try:
+                counts = store.value_counts(column, run_id=run_id, search=search, limit=top)
+                # Tk is not thread-safe: drawn by poll_events on the Tk loop.
+                self.events.put({'type': 'chart', 'column': column, 'counts': counts})
+            except Exception as e:
+                logging.error(f"Error visualizing data: {e}")
+            finally:
+                store.close()
+
+        threading.Thread(target=aggregate, daemon=True).start()
+
+    def draw_chart(self, column, counts):
+        if not counts:
+            messagebox.showerror("Error", "Error visualizing data: No data to visualize.")
+            return
+        labels = [str(value)[:30] for value, _ in counts]
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(labels[::-1], [count for _, count in counts][::-1])
+        ax.set_title(f'Top {len(counts)} values of {column}')
+        fig.tight_layout()
+
+        for widget in self.figure_frame.winfo_children():
+            widget.destroy()
+        if self.chart_figure is not None:
+            plt.close(self.chart_figure)
+        self.chart_figure = fig
+
+        canvas = FigureCanvasTkAgg(fig, master=self.figure_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+    def load_history(self):
+        # Read once at startup; after that runs are appended to the file
+        # and to the widget, never re-read or rewritten.
+        if os.path.exists('history.txt'):
+            with open('history.txt', 'r') as file:
+                history = file.read()
+        else:
+            history = "Task history:\n"
+            history_log.write(history)
+        self.history_text.insert(tk.END, history)
+
+    def update_history(self):
+        line = f"\nTask completed. Items found: {self.rows_found}"
+        history_log.write(line)
+        self.history_text.insert(tk.END, line)
+
+    def send_chat_message(self):
+        message = self.chat_input.get()
+        if message:
+            self.chat_display.insert(tk.END, f"You: {message}\n")
+            self.chat_input.delete(0, tk.END)
+            self.process_chat_message(message)
+        else:
+            messagebox.showwarning("Warning", "Please enter a message to send.")
+
+    def process_chat_message(self, message):
+        # Обработка сообщения и отправка запросов к API
+        if message.startswith("add_url"):
+            urls = message.split()[1:]
+            if urls:
+                response = requests.post(f"{self.api_url}/add_url", json={"urls": urls})
+                if response.status_code == 200:
+                    self.chat_display.insert(tk.END, f"Bot: URLs added: {', '.join(urls)}\n")
+                else:
+                    self.chat_display.insert(tk.END, f"Bot: Failed to add URLs. {response.json().get('message')}\n")
+            else:
+                self.chat_display.insert(tk.END, "Bot: Please provide at least one URL.\n")
+        elif message.startswith("list_urls"):
+            response = requests.get(f"{self.api_url}/list_urls")
+            if response.status_code == 200:
+                urls = response.json().get("urls", [])
+                if urls:
+                    self.chat_display.insert(tk.END, f"Bot: URLs for scraping:\n" + "\n".join(urls) + "\n")
+                else:
+                    self.chat_display.insert(tk.END, "Bot: No URLs found.\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to list URLs. {response.json().get('message')}\n")
+        elif message.startswith("clear_urls"):
+            response = requests.delete(f"{self.api_url}/clear_urls")
+            if response.status_code == 200:
+                self.chat_display.insert(tk.END, "Bot: All URLs cleared.\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to clear URLs. {response.json().get('message')}\n")
+        elif message.startswith("set_proxy"):
+            proxies = message.split()[1:]
+            response = requests.post(f"{self.api_url}/set_proxy", json={"proxies": proxies})
+            if response.status_code == 200:
+                self.chat_display.insert(tk.END, f"Bot: Proxy set to: {', '.join(proxies)}\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to set proxy. {response.json().get('message')}\n")
+        elif message.startswith("clear_proxy"):
+            response = requests.delete(f"{self.api_url}/clear_proxy")
+            if response.status_code == 200:
+                self.chat_display.insert(tk.END, "Bot: Proxy cleared.\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to clear proxy. {response.json().get('message')}\n")
+        elif message.startswith("run_scraper"):
+            response = requests.post(f"{self.api_url}/run_scraper")
+            if response.status_code == 200:
+                self.chat_display.insert(tk.END, "Bot: Scraper executed.\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to run scraper. {response.json().get('message')}\n")
+        elif message.startswith("report_error"):
+            error_message = " ".join(message.split()[1:])
+            response = requests.post(f"{self.api_url}/report_error", json={"error_message": error_message})
+            if response.status_code == 200:
+                self.chat_display.insert(tk.END, "Bot: Error reported.\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to report error. {response.json().get('message')}\n")
+        elif message.startswith("request_improvement"):
+            improvement_request = " ".join(message.split()[1:])
+            response = requests.post(f"{self.api_url}/request_improvement", json={"improvement_request": improvement_request})
+            if response.status_code == 200:
+                self.chat_display.insert(tk.END, "Bot: Improvement request submitted.\n")
+            else:
+                self.chat_display.insert(tk.END, f"Bot: Failed to submit improvement request. {response.json().get('message')}\n")
+        else:
+            self.chat_display.insert(tk.END, "Bot: Unknown command. Please try again.\n")
+
+if __name__ == '__main__':
+    app = ScrapyGUI()
+    app.mainloop()
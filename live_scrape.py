@@ -0,0 +1,232 @@
+
+import asyncio
+import concurrent.futures
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from playwright.async_api import async_playwright
+
+from deadlines import Deadline, current_deadline, within
+from metrics import counters_summary
+from scraper import DynamicContentScraper
+from singleflight import flights
+from utils import normalize_url, url_host
+
+
+# Seconds a synchronous caller waits past the page budget: queueing for a
+# context and opening a cold one.
+LOOKUP_MARGIN = 15
+
+
+class ScrapeError(Exception):
+    pass
+
+
+class ScrapeTimeout(ScrapeError):
+    pass
+
+
+def parse_max_age(value):
+    # Seconds a cached result may be old; None means the pool's TTL.
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError("max_age must be a number of seconds")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("max_age must be a number of seconds")
+    if not math.isfinite(value) or value < 0:
+        raise ValueError("max_age must be a non-negative number of seconds")
+    return value
+
+
+class WarmContext:
+    def __init__(self, profile, context, page, proxy=None):
+        self.profile = profile
+        self.context = context
+        self.page = page
+        self.proxy = proxy
+        self.uses = 0
+        self.ok = True
+
+
+class WarmPool:
+    # Single-page lookups for the API: one long-lived browser, a few
+    # contexts per session profile kept open with a page ready, a short-TTL
+    # result cache; identical concurrent requests share one fetch.
+    def __init__(self, config):
+        # Lookups are not part of a crawl: nothing is archived, governed or
+        # deduplicated.
+        self.scraper = DynamicContentScraper(dict(config, archive=None, governor=None, dedup=None))
+        self.size = config.get('warm_contexts', 2)
+        self.max_uses = config.get('warm_context_uses', 50)
+        self.ttl = config.get('scrape_cache_ttl', 60)
+        self.cache_size = config.get('scrape_cache_size', 1000)
+        self.semaphore = asyncio.Semaphore(self.size)
+        self.idle = {}
+        self.cache = OrderedDict()
+        self.playwright = None
+        self.browser = None
+        self.counters = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'fetches': 0, 'cold_contexts': 0}
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.scraper.launch_browser(self.playwright)
+        for profile in self.scraper.profiles.profiles:
+            self.idle[profile.name] = [await self.open_context(profile) for _ in range(self.size)]
+        logging.info(f"Warm pool ready with {sum(map(len, self.idle.values()))} contexts")
+
+    async def stop(self):
+        for contexts in self.idle.values():
+            for warm in contexts:
+                await self.close_context(warm)
+        self.idle = {}
+        await self.scraper.profiles.flush()
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+    async def open_context(self, profile):
+        context_args = profile.context_args()
+        proxy = None
+        if self.scraper.proxy_pool:
+            # Held for the life of the context; released when it is closed.
+            # Every proxy can be cooling down: a lookup waits no longer than
+            # its page budget.
+            proxy = await within(self.scraper.proxy_pool.acquire())
+            context_args['proxy'] = proxy.settings()
+        try:
+            context = await self.browser.new_context(**context_args)
+            return WarmContext(profile, context, await context.new_page(), proxy)
+        except BaseException:
+            if proxy:
+                await self.scraper.proxy_pool.release(proxy, False)
+            raise
+
+    async def close_context(self, warm):
+        try:
+            if warm.ok:
+                await warm.profile.save(warm.context)
+            await warm.context.close()
+        except Exception as e:
+            logging.error(f"Error closing warm context: {e}")
+        finally:
+            if warm.proxy:
+                await self.scraper.proxy_pool.release(warm.proxy, warm.ok)
+
+    async def checkout(self, profile):
+        contexts = self.idle.setdefault(profile.name, [])
+        if contexts:
+            return contexts.pop()
+        self.counters['cold_contexts'] += 1
+        return await self.open_context(profile)
+
+    async def checkin(self, warm):
+        contexts = self.idle.setdefault(warm.profile.name, [])
+        if warm.ok and warm.uses < self.max_uses and len(contexts) < self.size:
+            contexts.append(warm)
+        else:
+            await self.close_context(warm)
+
+    async def fetch(self, url):
+        async with self.semaphore:
+            self.counters['fetches'] += 1
+            started = time.monotonic()
+            # The budget also covers opening a cold context and its proxy.
+            token = current_deadline.set(Deadline((self.scraper.page_budget or 0) / 1000 or None))
+            warm = None
+            table = None
+            try:
+                warm = await self.checkout(self.scraper.profiles.for_url(url))
+                table = await within(self.scraper.extract_page(warm.page, url))
+            except asyncio.TimeoutError:
+                logging.error(f"Page budget exceeded for {url}")
+            except Exception as e:
+                logging.error(f"Error scraping {url}: {e}")
+            finally:
+                current_deadline.reset(token)
+                ok = table is not None
+                self.scraper.metrics.inc('pages_total', host=url_host(url), status='ok' if ok else 'error')
+                if warm is not None:
+                    warm.uses += 1
+                    warm.ok = ok
+                    await self.checkin(warm)
+        if table is None:
+            raise ScrapeError(f"Could not scrape {url}")
+        headers, rows = table
+        result = {'url': url, 'headers': headers, 'rows': rows, 'fetched_at': time.time(),
+                  'seconds': round(time.monotonic() - started, 3)}
+        self.cache[url] = (time.monotonic(), result)
+        self.cache.move_to_end(url)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    async def scrape(self, url, max_age=None):
+        url = normalize_url(url)
+        if url is None:
+            raise ValueError("Invalid URL")
+        max_age = parse_max_age(max_age)
+        self.counters['requests'] += 1
+        ttl = self.ttl if max_age is None else max_age
+        cached = self.cache.get(url)
+        if cached and time.monotonic() - cached[0] <= ttl:
+            self.counters['cache_hits'] += 1
+            self.cache.move_to_end(url)
+            return dict(cached[1], cached=True)
+        # Lookups return a different result from crawl fetches, and must not
+        # queue behind a crawl, so they only share with other lookups.
+        result, shared = await flights.do(('lookup',) + self.scraper.flight_key(url), lambda: self.fetch(url))
+        if shared:
+            self.counters['coalesced'] += 1
+        return dict(result, cached=False)
+
+    def lookup_timeout(self):
+        return (self.scraper.page_budget or self.scraper.timeout) / 1000 + LOOKUP_MARGIN
+
+    def counters_summary(self):
+        return counters_summary(self.counters, 'warm_pool')
+
+
+class BackgroundPool:
+    # WarmPool for synchronous servers (Flask): the pool lives on its own
+    # event loop in a daemon thread and requests are submitted to it.
+    def __init__(self, config):
+        self.config = config
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def call(self, coroutine, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def ensure_started(self):
+        with self.lock:
+            if self.pool is None:
+                async def start():
+                    pool = WarmPool(self.config)
+                    try:
+                        await pool.start()
+                    except Exception:
+                        await pool.stop()
+                        raise
+                    return pool
+                self.pool = self.call(start())
+        return self.pool
+
+    def scrape(self, url, max_age=None, timeout=None):
+        # Bounded so a stuck lookup cannot hold a server worker forever.
+        pool = self.ensure_started()
+        future = asyncio.run_coroutine_threadsafe(pool.scrape(url, max_age), self.loop)
+        try:
+            return future.result(pool.lookup_timeout() if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise ScrapeTimeout(f"Timed out scraping {url}")
@@ -0,0 +1,140 @@
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from output_files import atomic_write
+
+STAGES = ('queue_wait', 'browser_acquire', 'navigation', 'readiness', 'content_fetch', 'parse', 'write')
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation; values
+        # beyond the last bucket report that bucket's bound.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def to_dict(self):
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative.append([bound, seen])
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': cumulative,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, host, seconds):
+        key = (stage, host or 'unknown')
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(self.buckets)
+        self.histograms[key].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage, host):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, host, time.perf_counter() - started)
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            'duration': round(time.time() - self.started, 3),
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ],
+            'stages': [
+                dict(stage=stage, host=host, **histogram.to_dict())
+                for (stage, host), histogram in sorted(self.histograms.items())
+            ],
+        }
+
+    def dump(self, filename):
+        summary = self.to_dict()
+        # /metrics reads this file while a run may be writing it.
+        with atomic_write(filename) as f:
+            json.dump(summary, f, ensure_ascii=False, indent=4)
+        logging.info(f"Metrics saved to {filename}")
+        return summary
+
+
+def counters_summary(counters, prefix):
+    # Plain counters in the shape of Metrics.to_dict()['counters'], for
+    # render_prometheus.
+    return [{'name': f"{prefix}_{name}_total", 'labels': {}, 'value': value} for name, value in counters.items()]
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def render_prometheus(summary, prefix='scraper'):
+    lines = []
+    counter_names = []
+    for counter in summary.get('counters', []):
+        if counter['name'] not in counter_names:
+            counter_names.append(counter['name'])
+    for name in counter_names:
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for counter in summary['counters']:
+            if counter['name'] == name:
+                lines.append(f"{prefix}_{name}{_labels(counter['labels'])} {counter['value']}")
+
+    metric = f"{prefix}_stage_seconds"
+    if summary.get('stages'):
+        lines.append(f"# TYPE {metric} histogram")
+    for stage in summary.get('stages', []):
+        labels = {'stage': stage['stage'], 'host': stage['host']}
+        for bound, count in stage['buckets']:
+            lines.append(f"{metric}_bucket{_labels(dict(labels, le=bound))} {count}")
+        lines.append(f"{metric}_bucket{_labels(dict(labels, le='+Inf'))} {stage['count']}")
+        lines.append(f"{metric}_sum{_labels(labels)} {stage['sum']}")
+        lines.append(f"{metric}_count{_labels(labels)} {stage['count']}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,133 @@
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from scraper import DynamicContentScraper
+
+CYRILLIC = "Общество с ограниченной ответственностью «Ромашка», г. Москва, ул. Тверская, д. 1"
+
+
+def table_html(rows, cols, cell):
+    parts = ['<html><head><meta charset="utf-8"></head><body><table><tr>']
+    parts.extend(f'<th>Колонка {c}</th>' for c in range(cols))
+    parts.append('</tr>')
+    for r in range(rows):
+        parts.append('<tr>' + ''.join(f'<td>{cell(r, c)}</td>' for c in range(cols)) + '</tr>')
+    parts.append('</table></body></html>')
+    return ''.join(parts)
+
+
+CORPORA = {
+    'wide': lambda: table_html(200, 200, lambda r, c: f"{r}-{c}"),
+    'long': lambda: table_html(50000, 5, lambda r, c: f"value {r} {c}"),
+    'nested': lambda: table_html(5000, 8, lambda r, c: f'<div><span><a href="/card/{r}"><b>{r}</b></a> <i>{c}</i></span></div>'),
+    'cyrillic': lambda: table_html(20000, 6, lambda r, c: f"{CYRILLIC} {r}"),
+}
+
+
+def new_scraper(workdir):
+    return DynamicContentScraper({'profiles_dir': os.path.join(workdir, 'profiles')})
+
+
+def bench_parse(html, workdir):
+    scraper = new_scraper(workdir)
+    started = time.perf_counter()
+    scraper.parse_data(html)
+    return len(scraper.data), time.perf_counter() - started
+
+
+def writer_bench(method, extension):
+    def bench(html, workdir):
+        scraper = new_scraper(workdir)
+        scraper.parse_data(html)
+        started = time.perf_counter()
+        getattr(scraper, method)(os.path.join(workdir, f'output.{extension}'))
+        return len(scraper.data), time.perf_counter() - started
+    return bench
+
+
+# New parser or writer backends register themselves here to get a
+# throughput figure and a baseline check.
+BENCHMARKS = {
+    'parse_data': bench_parse,
+    'save_to_csv': writer_bench('save_to_csv', 'csv'),
+    'save_to_json': writer_bench('save_to_json', 'json'),
+    'save_to_excel': writer_bench('save_to_excel', 'xlsx'),
+    'save_to_parquet': writer_bench('save_to_parquet', 'parquet'),
+    'save_to_arrow': writer_bench('save_to_arrow', 'arrow'),
+}
+
+
+def run(benchmarks, corpora, repeat):
+    results = {}
+    for corpus_name in corpora:
+        html = CORPORA[corpus_name]()
+        for bench_name in benchmarks:
+            best = None
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory() as workdir:
+                    rows, seconds = BENCHMARKS[bench_name](html, workdir)
+                if best is None or seconds < best:
+                    best = seconds
+            throughput = rows / best if best else 0.0
+            key = f"{bench_name}/{corpus_name}"
+            results[key] = {'rows': rows, 'seconds': round(best, 4), 'rows_per_second': round(throughput, 1)}
+            print(f"{key:<30} {throughput:>14,.0f} rows/s ({best:.4f}s)")
+    return results
+
+
+def check(results, baseline, threshold):
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key, {}).get('rows_per_second')
+        if not expected:
+            continue
+        change = (result['rows_per_second'] / expected - 1) * 100
+        if change < -threshold:
+            regressions.append(key)
+            print(f"REGRESSION {key}: {result['rows_per_second']:,.0f} rows/s vs baseline {expected:,.0f} ({change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for parse_data and the exporters")
+    parser.add_argument('--bench', nargs='*', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--corpus', nargs='*', default=list(CORPORA), choices=list(CORPORA))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default='microbench_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=10.0, help="allowed throughput drop in percent")
+    parser.add_argument('--output', default='microbench_results.json')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run(args.bench, args.corpus, args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=4)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    return 1 if check(results, baseline, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
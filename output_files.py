@@ -0,0 +1,159 @@
+
+import atexit
+import contextlib
+import logging
+import os
+import threading
+
+# Output files are written through a large buffer, and the data written so
+# far is flushed and synced every SYNC_BYTES so the kernel never holds a
+# whole export dirty and the final fsync stays short.
+WRITE_BUFFER = 1 << 22
+SYNC_BYTES = 1 << 26
+
+
+def temp_path(filename):
+    # Next to the target (same filesystem, so the rename is atomic) and with
+    # the same extension, which pandas and pyarrow use to pick a format.
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{os.getpid()}-{threading.get_ident()}.tmp{ext}"
+
+
+def sync_file(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def sync_directory(path):
+    # Makes the rename itself durable. Not possible on Windows, where
+    # directories cannot be opened.
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SyncedFile:
+    # Group commit for one file: writes are only buffered, and every
+    # sync_bytes of them are flushed and fsynced together.
+    def __init__(self, f, sync_bytes=SYNC_BYTES):
+        self.f = f
+        self.sync_bytes = sync_bytes
+        self.pending = 0
+
+    def write(self, data):
+        written = self.f.write(data)
+        self.pending += len(data)
+        if self.pending >= self.sync_bytes:
+            self.sync()
+        return written
+
+    def sync(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.pending = 0
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __iter__(self):
+        return iter(self.f)
+
+
+@contextlib.contextmanager
+def atomic_write(filename, mode='w', encoding='utf-8', newline=None, sync_bytes=SYNC_BYTES):
+    # Readers of filename see the previous version or the complete new one,
+    # never a partly written file.
+    tmp_path = temp_path(filename)
+    try:
+        with open(tmp_path, mode, buffering=WRITE_BUFFER, encoding=None if 'b' in mode else encoding,
+                  newline=None if 'b' in mode else newline) as f:
+            synced = SyncedFile(f, sync_bytes)
+            yield synced
+            synced.sync()
+        os.replace(tmp_path, filename)
+    except BaseException:
+        discard(tmp_path)
+        raise
+    sync_directory(filename)
+
+
+@contextlib.contextmanager
+def atomic_path(filename):
+    # atomic_write for writers that only accept a path (Excel, Parquet,
+    # Arrow IPC): they write to the yielded path, which replaces filename
+    # once they are done.
+    tmp_path = temp_path(filename)
+    try:
+        yield tmp_path
+        sync_file(tmp_path)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        discard(tmp_path)
+        raise
+    sync_directory(filename)
+
+
+class AppendLog:
+    # Append-only log with group commit: records written within
+    # flush_interval of each other go to disk in one O_APPEND write and one
+    # fsync. Earlier records are never rewritten.
+    def __init__(self, filename, flush_interval=0.5, max_pending=1000):
+        self.filename = filename
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = []
+        self.lock = threading.Lock()
+        self.timer = None
+        # The flush timer is a daemon thread and dies with the interpreter;
+        # records still pending at exit are written here.
+        atexit.register(self.flush)
+
+    def write(self, text):
+        with self.lock:
+            self.pending.append(text)
+            if len(self.pending) >= self.max_pending:
+                self._flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        data = ''.join(self.pending).encode('utf-8')
+        self.pending = []
+        try:
+            fd = os.open(self.filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logging.error(f"Error appending to {self.filename}: {e}")
+
+    def close(self):
+        self.flush()
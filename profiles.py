@@ -0,0 +1,168 @@
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from output_files import atomic_write
+from utils import url_host
+
+DEFAULT_PROFILES = [
+    {
+        'name': 'windows-chrome',
+        'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        'viewport': {'width': 1920, 'height': 1080},
+    },
+    {
+        'name': 'mac-chrome',
+        'user_agent': "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        'viewport': {'width': 1440, 'height': 900},
+    },
+    {
+        'name': 'linux-chrome',
+        'user_agent': "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        'viewport': {'width': 1366, 'height': 768},
+    },
+]
+
+
+class SessionProfile:
+    def __init__(self, name, user_agent=None, viewport=None, locale=None, timezone_id=None, storage_state=None,
+                 save_interval=30):
+        self.name = name
+        self.user_agent = user_agent
+        self.viewport = viewport
+        self.locale = locale
+        self.timezone_id = timezone_id
+        self.storage_state = storage_state
+        self.save_interval = save_interval
+        # Snapshots merged in memory; written to storage_state at most every
+        # save_interval seconds and when the run ends.
+        self.state = None
+        self.dirty = False
+        self.saved_at = None
+        self._lock = asyncio.Lock()
+
+    def context_args(self):
+        args = {}
+        if self.user_agent:
+            args['user_agent'] = self.user_agent
+        if self.viewport:
+            args['viewport'] = self.viewport
+        if self.locale:
+            args['locale'] = self.locale
+        if self.timezone_id:
+            args['timezone_id'] = self.timezone_id
+        if self.state is not None:
+            args['storage_state'] = self.state
+        elif self.storage_state and os.path.exists(self.storage_state):
+            args['storage_state'] = self.storage_state
+        return args
+
+    async def save(self, context):
+        if not self.storage_state:
+            return
+        async with self._lock:
+            try:
+                state = await context.storage_state()
+            except Exception as e:
+                logging.error(f"Error reading storage state for profile {self.name}: {e}")
+                return
+            self.state = merge_states(self.state or {}, state)
+            self.dirty = True
+            if self.saved_at is None or time.monotonic() - self.saved_at >= self.save_interval:
+                await self.write()
+
+    async def flush(self):
+        if not self.storage_state:
+            return
+        async with self._lock:
+            if self.dirty:
+                await self.write()
+
+    async def write(self):
+        self.saved_at = time.monotonic()
+        try:
+            self.state = await asyncio.to_thread(merge_storage_state, self.storage_state, self.state)
+            self.dirty = False
+        except Exception as e:
+            logging.error(f"Error saving storage state for profile {self.name}: {e}")
+
+
+# One lock per state file, shared by every scraper and warm pool in the
+# process whatever event loop they run on.
+state_locks = {}
+state_locks_lock = threading.Lock()
+
+
+def cookie_key(cookie):
+    return cookie.get('name'), cookie.get('domain'), cookie.get('path')
+
+
+def merge_states(saved, state):
+    # Contexts on one profile save concurrently, each with a full snapshot.
+    # Cookies are merged by name, domain and path instead of the last
+    # snapshot replacing the others. A context that never touched a cookie
+    # still reports the value it started with, so of two copies the one
+    # expiring later (the refreshed one) is kept.
+    now = time.time()
+    cookies = {}
+    for cookie in saved.get('cookies', []):
+        if cookie.get('expires', -1) == -1 or cookie['expires'] > now:
+            cookies[cookie_key(cookie)] = cookie
+    for cookie in state.get('cookies', []):
+        key = cookie_key(cookie)
+        previous = cookies.get(key)
+        if previous is None or cookie.get('expires', -1) >= previous.get('expires', -1):
+            cookies[key] = cookie
+    origins = {origin['origin']: origin for origin in saved.get('origins', [])}
+    origins.update((origin['origin'], origin) for origin in state.get('origins', []))
+    return dict(state, cookies=list(cookies.values()), origins=list(origins.values()))
+
+
+def merge_storage_state(path, state):
+    # Merges state into the file, which other scrapers on the same profile
+    # may have written meanwhile, and returns the result.
+    with state_locks_lock:
+        lock = state_locks.setdefault(os.path.abspath(path), threading.Lock())
+    with lock:
+        saved = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+            except ValueError:
+                saved = {}
+        merged = merge_states(saved, state)
+        with atomic_write(path) as f:
+            json.dump(merged, f, ensure_ascii=False)
+        return merged
+
+
+class ProfileStore:
+    def __init__(self, profiles):
+        self.profiles = profiles
+
+    @classmethod
+    def from_config(cls, config):
+        directory = config.get('profiles_dir', 'profiles')
+        os.makedirs(directory, exist_ok=True)
+        profiles = []
+        for entry in config.get('profiles') or DEFAULT_PROFILES:
+            entry = dict(entry)
+            entry.setdefault('storage_state', os.path.join(directory, f"{entry['name']}.json"))
+            entry.setdefault('save_interval', config.get('profile_save_interval', 30))
+            profiles.append(SessionProfile(**entry))
+        return cls(profiles)
+
+    async def flush(self):
+        for profile in self.profiles:
+            await profile.flush()
+
+    def for_url(self, url):
+        # A host always maps to the same profile so its cookies and
+        # localStorage are reused from one run to the next.
+        host = url_host(url) or url
+        return self.profiles[zlib.crc32(host.encode('utf-8')) % len(self.profiles)]
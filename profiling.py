@@ -0,0 +1,130 @@
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class SlowCallbackHandler(logging.Handler):
+    def __init__(self, records):
+        super().__init__(level=logging.WARNING)
+        self.records = records
+
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith('Executing'):
+            self.records.append({'time': record.created, 'message': message})
+
+
+class RunProfiler:
+    def __init__(self, directory='reports', slow_callback_duration=0.1):
+        self.directory = os.path.join(directory, time.strftime('profile-%Y%m%d-%H%M%S'))
+        self.slow_callback_duration = slow_callback_duration
+        self.parse_profile = cProfile.Profile()
+        self.tasks = []
+        self.memory = []
+        self.slow_callbacks = []
+        self._handler = SlowCallbackHandler(self.slow_callbacks)
+        self.started = time.perf_counter()
+        self.parse_calls = 0
+        self.parse_lock = threading.Lock()
+        self.loop = None
+        self.loop_settings = None
+        self.started_tracing = False
+
+    def install(self, loop):
+        # asyncio debug mode logs every callback that blocks the loop for
+        # longer than slow_callback_duration through the 'asyncio' logger.
+        self.loop = loop
+        self.loop_settings = (loop.get_debug(), loop.slow_callback_duration)
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback_duration
+        logging.getLogger('asyncio').addHandler(self._handler)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def restore_loop(self, loop):
+        debug, slow_callback_duration = self.loop_settings
+        loop.set_debug(debug)
+        loop.slow_callback_duration = slow_callback_duration
+
+    def uninstall(self):
+        # A server loop outlives the profiled job: debug mode and tracing
+        # are switched back off. write_reports runs in a worker thread
+        # there, so the loop is changed from its own thread.
+        logging.getLogger('asyncio').removeHandler(self._handler)
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.restore_loop, self.loop)
+        self.loop = None
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    @contextmanager
+    def task(self, url):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tasks.append({
+                'url': url,
+                'offset': round(started - self.started, 6),
+                'duration': round(time.perf_counter() - started, 6),
+            })
+
+    @contextmanager
+    def parse(self, url):
+        # Parses may run in worker threads (parse_in_thread); one at a time
+        # is profiled, as the profiler and the traced peak are shared.
+        with self.parse_lock:
+            with self.profile_one_parse(url):
+                yield
+
+    @contextmanager
+    def profile_one_parse(self, url):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        self.parse_calls += 1
+        self.parse_profile.enable()
+        try:
+            yield
+        finally:
+            self.parse_profile.disable()
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                self.memory.append({'url': url, 'peak_bytes': peak - before, 'retained_bytes': current - before})
+
+    def write_reports(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        if self.parse_calls:
+            self.parse_profile.dump_stats(os.path.join(self.directory, 'parse.prof'))
+            stream = io.StringIO()
+            pstats.Stats(self.parse_profile, stream=stream).sort_stats('cumulative').print_stats(50)
+            with open(os.path.join(self.directory, 'parse_stats.txt'), 'w', encoding='utf-8') as f:
+                f.write(stream.getvalue())
+
+        tasks = sorted(self.tasks, key=lambda task: task['duration'], reverse=True)
+        with open(os.path.join(self.directory, 'tasks.json'), 'w', encoding='utf-8') as f:
+            json.dump(tasks, f, ensure_ascii=False, indent=4)
+
+        memory = sorted(self.memory, key=lambda entry: entry['peak_bytes'], reverse=True)
+        report = {'traced_peak_bytes': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None, 'urls': memory}
+        with open(os.path.join(self.directory, 'memory.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        self.uninstall()
+
+        with open(os.path.join(self.directory, 'slow_callbacks.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.slow_callbacks, f, ensure_ascii=False, indent=4)
+
+        logging.info(f"Profile reports saved to {self.directory}")
+        return self.directory
@@ -0,0 +1,152 @@
+
+import asyncio
+import logging
+import random
+import time
+
+
+class Proxy:
+    def __init__(self, server, username=None, password=None, weight=1, max_concurrency=2):
+        self.server = server
+        self.username = username
+        self.password = password
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.health = 1.0
+        self.latency = None
+        self.failures = 0
+        self.ejections = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+
+    @classmethod
+    def from_entry(cls, entry, max_concurrency=2):
+        if isinstance(entry, str):
+            return cls(entry, max_concurrency=max_concurrency)
+        entry = dict(entry)
+        entry.setdefault('max_concurrency', max_concurrency)
+        return cls(**entry)
+
+    def settings(self):
+        settings = {'server': self.server}
+        if self.username:
+            settings['username'] = self.username
+            settings['password'] = self.password or ""
+        return settings
+
+    def is_available(self, now):
+        return now >= self.cooldown_until and self.in_flight < self.max_concurrency
+
+    def score(self):
+        # Healthy, fast proxies get proportionally more traffic.
+        latency = self.latency if self.latency is not None else 1.0
+        return self.weight * max(self.health, 0.01) / max(latency, 0.05)
+
+    def stats(self):
+        return {
+            'server': self.server,
+            'health': round(self.health, 3),
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'cooling_down': time.monotonic() < self.cooldown_until,
+        }
+
+
+class ProxyPool:
+    def __init__(self, proxies, strategy='round_robin', max_failures=3, cooldown=60, max_cooldown=900, alpha=0.3):
+        if strategy not in ('round_robin', 'weighted'):
+            raise ValueError(f"Unknown proxy strategy: {strategy}")
+        self.proxies = proxies
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self._cursor = 0
+        self._condition = None
+
+    @classmethod
+    def from_config(cls, config):
+        entries = config.get('proxies') or []
+        if not entries and config.get('proxy'):
+            entries = [config['proxy']]
+        options = config.get('proxy_pool', {})
+        max_concurrency = options.get('max_concurrency', 2)
+        proxies = [Proxy.from_entry(entry, max_concurrency) for entry in entries]
+        return cls(
+            proxies,
+            strategy=options.get('strategy', 'round_robin'),
+            max_failures=options.get('max_failures', 3),
+            cooldown=options.get('cooldown', 60),
+            max_cooldown=options.get('max_cooldown', 900),
+        )
+
+    def __len__(self):
+        return len(self.proxies)
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _select(self, now):
+        candidates = [proxy for proxy in self.proxies if proxy.is_available(now)]
+        if not candidates:
+            return None
+        if self.strategy == 'weighted':
+            return random.choices(candidates, weights=[proxy.score() for proxy in candidates])[0]
+        for offset in range(len(self.proxies)):
+            proxy = self.proxies[(self._cursor + offset) % len(self.proxies)]
+            if proxy in candidates:
+                self._cursor = (self._cursor + offset + 1) % len(self.proxies)
+                return proxy
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                now = time.monotonic()
+                proxy = self._select(now)
+                if proxy:
+                    proxy.in_flight += 1
+                    proxy.requests += 1
+                    return proxy
+                # Wake up either when a slot is released or when the earliest
+                # cooling-down proxy becomes usable again.
+                cooling = [p.cooldown_until - now for p in self.proxies if p.cooldown_until > now]
+                timeout = min(cooling) if cooling else None
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, proxy, ok, latency=None):
+        condition = self._get_condition()
+        async with condition:
+            proxy.in_flight -= 1
+            self.record(proxy, ok, latency)
+            condition.notify_all()
+
+    def record(self, proxy, ok, latency=None):
+        proxy.health = (1 - self.alpha) * proxy.health + self.alpha * (1.0 if ok else 0.0)
+        if ok:
+            proxy.failures = 0
+            proxy.ejections = 0
+            if latency is not None:
+                if proxy.latency is None:
+                    proxy.latency = latency
+                else:
+                    proxy.latency = (1 - self.alpha) * proxy.latency + self.alpha * latency
+            return
+        proxy.failures += 1
+        if proxy.failures >= self.max_failures:
+            cooldown = min(self.cooldown * 2 ** proxy.ejections, self.max_cooldown)
+            proxy.cooldown_until = time.monotonic() + cooldown
+            proxy.ejections += 1
+            proxy.failures = 0
+            logging.warning(f"Proxy {proxy.server} ejected for {cooldown}s after repeated failures")
+
+    def stats(self):
+        return [proxy.stats() for proxy in self.proxies]
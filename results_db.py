@@ -0,0 +1,194 @@
+
+import hashlib
+import json
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    source_url TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (source_url, row_key)
+);
+CREATE INDEX IF NOT EXISTS results_last_run ON results (last_run);
+CREATE INDEX IF NOT EXISTS results_last_seen ON results (last_seen);
+CREATE TABLE IF NOT EXISTS run_rows (
+    run_id INTEGER NOT NULL,
+    result_id INTEGER NOT NULL,
+    PRIMARY KEY (run_id, result_id)
+) WITHOUT ROWID;
+"""
+
+UPSERT = """
+INSERT INTO results (source_url, row_key, data, first_run, last_run, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source_url, row_key) DO UPDATE SET
+    data = excluded.data,
+    last_run = excluded.last_run,
+    last_seen = excluded.last_seen
+"""
+
+# Largest page query() returns.
+MAX_LIMIT = 1000
+
+LINK_RUN = """
+INSERT OR IGNORE INTO run_rows (run_id, result_id)
+SELECT ?, id FROM results WHERE source_url = ? AND row_key = ?
+"""
+
+
+def row_key(record, key_columns=None):
+    if key_columns:
+        return '\x1f'.join(str(record.get(column, '')) for column in key_columns)
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def json_path(column):
+    return '$."' + column.replace('"', '\\"') + '"'
+
+
+class ResultsStore:
+    def __init__(self, filename='results.db'):
+        self.filename = filename
+        # WAL lets readers (API, GUI) page through results while a crawl
+        # is writing.
+        self.conn = sqlite3.connect(filename, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, started_at=None):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, status) VALUES (?, 'running')", (started_at or time.time(),))
+        return cursor.lastrowid
+
+    def finish_run(self, run_id, status='finished', rows=0):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ?, rows = ? WHERE run_id = ?",
+                (time.time(), status, rows, run_id))
+
+    def upsert(self, run_id, records, key_columns=None, batch_size=5000):
+        # records yields (source_url, record) pairs; each batch is one
+        # transaction.
+        count = 0
+        batch = []
+        for source_url, record in records:
+            batch.append((source_url or '', row_key(record, key_columns), json.dumps(record, ensure_ascii=False)))
+            if len(batch) >= batch_size:
+                count += self._write_batch(run_id, batch)
+                batch = []
+        if batch:
+            count += self._write_batch(run_id, batch)
+        return count
+
+    def _write_batch(self, run_id, batch):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(UPSERT, [(source, key, data, run_id, run_id, now, now) for source, key, data in batch])
+            self.conn.executemany(LINK_RUN, [(run_id, source, key) for source, key, _ in batch])
+        return len(batch)
+
+    def _where(self, run_id=None, source_url=None, filters=None, search=None):
+        clauses = []
+        params = []
+        if run_id is not None:
+            clauses.append("id IN (SELECT result_id FROM run_rows WHERE run_id = ?)")
+            params.append(run_id)
+        if source_url:
+            clauses.append("source_url = ?")
+            params.append(source_url)
+        for column, value in (filters or {}).items():
+            clauses.append("json_extract(data, ?) = ?")
+            params.extend([json_path(column), value])
+        if search:
+            clauses.append("data LIKE ?")
+            params.append(f"%{search}%")
+        return clauses, params
+
+    def query(self, run_id=None, source_url=None, filters=None, search=None, after=0, limit=100, columns=None,
+              offset=0):
+        # Keyset pagination on the result id: pass the returned cursor as
+        # `after` to get the next page. `offset` is for random access (the
+        # GUI grid jumping to a scroll position).
+        # LIMIT -1 would mean "no limit" to SQLite.
+        limit = max(1, min(limit, MAX_LIMIT))
+        clauses, params = self._where(run_id, source_url, filters, search)
+        clauses.append("id > ?")
+        params.append(after)
+        if columns:
+            # Projection happens in SQLite so unused fields are never decoded.
+            selected = ', '.join(f"json_extract(data, ?) AS c{i}" for i in range(len(columns)))
+            params = [json_path(column) for column in columns] + params
+        else:
+            selected = 'data'
+        sql = (f"SELECT id, source_url, last_run, last_seen, {selected} FROM results "
+               f"WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ? OFFSET ?")
+        rows = self.conn.execute(sql, params + [limit, offset]).fetchall()
+        items = []
+        for row in rows:
+            if columns:
+                data = {column: row[f"c{i}"] for i, column in enumerate(columns)}
+            else:
+                data = json.loads(row['data'])
+            items.append({
+                'id': row['id'],
+                'source_url': row['source_url'],
+                'last_run': row['last_run'],
+                'last_seen': row['last_seen'],
+                'data': data,
+            })
+        cursor = items[-1]['id'] if items and len(items) == limit else None
+        return items, cursor
+
+    def iter_results(self, batch_size=1000, after=0, **query):
+        # Short keyset batches instead of one long cursor, so a slow client
+        # never pins a single read snapshot for the whole export.
+        while True:
+            items, cursor = self.query(after=after, limit=batch_size, **query)
+            yield from items
+            if cursor is None:
+                return
+            after = cursor
+
+    def count(self, run_id=None, source_url=None, filters=None, search=None):
+        clauses, params = self._where(run_id, source_url, filters, search)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.conn.execute(f"SELECT COUNT(*) FROM results {where}", params).fetchone()[0]
+
+    def value_counts(self, column, run_id=None, search=None, limit=20):
+        # Aggregated in SQLite so charts never load the rows themselves.
+        clauses, params = self._where(run_id, None, None, search)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = (f"SELECT json_extract(data, ?) AS value, COUNT(*) AS n FROM results {where} "
+               f"GROUP BY value ORDER BY n DESC LIMIT ?")
+        rows = self.conn.execute(sql, [json_path(column)] + params + [limit]).fetchall()
+        return [(row['value'], row['n']) for row in rows]
+
+    def runs(self, limit=50):
+        rows = self.conn.execute("SELECT * FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_run(self, status='finished'):
+        row = self.conn.execute(
+            "SELECT run_id FROM runs WHERE status = ? ORDER BY run_id DESC LIMIT 1", (status,)).fetchone()
+        return row['run_id'] if row else None
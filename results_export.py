@@ -0,0 +1,92 @@
+
+import csv
+import io
+import json
+import zlib
+
+
+def int_arg(args, name, default=None):
+    value = args.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def results_filters(store, args):
+    run_id = int_arg(args, 'run_id')
+    if args.get('run_id') == 'latest':
+        run_id = store.latest_run()
+    filters = {key[len('where.'):]: value for key, value in args.items() if key.startswith('where.')}
+    columns = [column for column in (args.get('columns') or '').split(',') if column]
+    return {
+        'run_id': run_id,
+        'source_url': args.get('source_url'),
+        'filters': filters,
+        'search': args.get('q'),
+        'columns': columns or None,
+    }
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield json.dumps(dict(item['data'], _id=item['id'], _source_url=item['source_url']), ensure_ascii=False) + '\n'
+
+
+def csv_lines(items, columns):
+    buffer = io.StringIO()
+    writer = None
+    for item in items:
+        if writer is None:
+            # Without ?columns= the header comes from the first row.
+            writer = csv.DictWriter(buffer, fieldnames=columns or list(item['data']), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow(item['data'])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_chunks(chunks, flush_bytes=64 * 1024):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk.encode('utf-8'))
+        size += len(pending[-1])
+        if size >= flush_bytes:
+            yield compressor.compress(b''.join(pending))
+            pending = []
+            size = 0
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
+
+
+def batched_chunks(chunks, flush_bytes=64 * 1024):
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= flush_bytes:
+            yield ''.join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def export_chunks(store, args, export_format, use_gzip):
+    # Reads in keyset batches on the caller's own connection, so memory
+    # stays flat and a crawl can keep writing meanwhile.
+    try:
+        filters = results_filters(store, args)
+        items = store.iter_results(after=int_arg(args, 'after', 0), **filters)
+        if export_format == 'csv':
+            lines = csv_lines(items, filters['columns'])
+        else:
+            lines = ndjson_lines(items)
+        yield from (gzip_chunks(lines) if use_gzip else batched_chunks(lines))
+    finally:
+        store.close()
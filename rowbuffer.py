@@ -0,0 +1,196 @@
+
+import sys
+from array import array
+
+MISSING = -1
+
+
+class Column:
+    # Dictionary-encodes values: every distinct string is stored once and
+    # rows keep an int32 code. Columns that turn out to be mostly unique
+    # (ids, phone numbers) stop deduplicating so the index does not cost
+    # more than it saves.
+    def __init__(self, name, sample_size=10000, unique_ratio=0.5):
+        self.name = name
+        self.values = []
+        self.index = {}
+        self.sample_size = sample_size
+        self.unique_ratio = unique_ratio
+        self.encoded = 0
+
+    @property
+    def is_dictionary(self):
+        return self.index is not None
+
+    def encode(self, value):
+        if value is None:
+            return MISSING
+        self.encoded += 1
+        if self.index is None:
+            self.values.append(value)
+            return len(self.values) - 1
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+            if self.encoded >= self.sample_size and len(self.values) > self.encoded * self.unique_ratio:
+                self.index = None
+        return code
+
+
+class Chunk:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.codes = {}
+        self.sources = array('i')
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def column_codes(self, name):
+        codes = self.codes.get(name)
+        if codes is None:
+            codes = array('i', [MISSING]) * self.length
+        return codes
+
+    def records(self, with_source=False):
+        columns = [(name, column.values, self.codes.get(name)) for name, column in self.buffer.columns.items()]
+        sources = self.buffer.sources.values
+        for i in range(self.length):
+            record = {}
+            for name, values, codes in columns:
+                if codes is not None:
+                    code = codes[i]
+                    if code != MISSING:
+                        record[name] = values[code]
+            if with_source:
+                code = self.sources[i]
+                yield (sources[code] if code != MISSING else None), record
+            else:
+                yield record
+
+
+class RowBuffer:
+    def __init__(self, chunk_rows=65536):
+        self.chunk_rows = chunk_rows
+        self.columns = {}
+        # Page each row came from; kept apart from the data columns so the
+        # exported records are unchanged.
+        self.sources = Column('source_url')
+        self.chunks = []
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return self.records()
+
+    def __repr__(self):
+        return f"<RowBuffer rows={self.length} columns={list(self.columns)} chunks={len(self.chunks)}>"
+
+    def _column(self, name):
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[sys.intern(name)] = Column(name)
+        return column
+
+    def _current_chunk(self):
+        if not self.chunks or len(self.chunks[-1]) >= self.chunk_rows:
+            self.chunks.append(Chunk(self))
+        return self.chunks[-1]
+
+    def _chunk_codes(self, chunk, name):
+        codes = chunk.codes.get(name)
+        if codes is None:
+            # Column first seen mid-chunk: earlier rows do not have it.
+            codes = chunk.codes[name] = array('i', [MISSING]) * chunk.length
+        return codes
+
+    def append(self, record, source=None):
+        chunk = self._current_chunk()
+        chunk.sources.append(self.sources.encode(source))
+        for name, value in record.items():
+            self._chunk_codes(chunk, name).append(self._column(name).encode(value))
+        chunk.length += 1
+        for name, codes in chunk.codes.items():
+            if len(codes) < chunk.length:
+                codes.append(MISSING)
+        self.length += 1
+
+    def extend(self, headers, rows, source=None):
+        # Fast path for rows that share one header list, as produced by
+        # extract_table() and the in-page extractor.
+        # Repeated header names (two blank <th> cells) keep the last cell,
+        # as a dict built from the row would.
+        positions = {name: position for position, name in enumerate(headers)}
+        columns = [(name, position, self._column(name)) for name, position in positions.items()]
+        start = 0
+        while start < len(rows):
+            chunk = self._current_chunk()
+            batch = rows[start:start + self.chunk_rows - len(chunk)]
+            chunk.sources.extend(array('i', [self.sources.encode(source)]) * len(batch))
+            for name, position, column in columns:
+                encode = column.encode
+                self._chunk_codes(chunk, name).extend(encode(cells[position]) for cells in batch)
+            chunk.length += len(batch)
+            for name, codes in chunk.codes.items():
+                if len(codes) < chunk.length:
+                    codes.extend(array('i', [MISSING]) * (chunk.length - len(codes)))
+            self.length += len(batch)
+            start += len(batch)
+
+    def records(self, with_source=False):
+        for chunk in self.chunks:
+            yield from chunk.records(with_source)
+
+    def column_codes(self, name):
+        if len(self.chunks) == 1:
+            return self.chunks[0].column_codes(name)
+        codes = array('i')
+        for chunk in self.chunks:
+            codes.extend(chunk.column_codes(name))
+        return codes
+
+    def source_codes(self):
+        if len(self.chunks) == 1:
+            return self.chunks[0].sources
+        codes = array('i')
+        for chunk in self.chunks:
+            codes.extend(chunk.sources)
+        return codes
+
+    def to_pandas(self):
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for name, column in self.columns.items():
+            # frombuffer shares memory with the int32 code array.
+            codes = np.frombuffer(self.column_codes(name), dtype=np.int32)
+            if column.is_dictionary:
+                data[name] = pd.Categorical.from_codes(codes, categories=pd.Index(column.values, dtype=object))
+            else:
+                values = np.empty(len(column.values) + 1, dtype=object)
+                values[:-1] = column.values
+                values[-1] = None
+                data[name] = values[codes]
+        return pd.DataFrame(data)
+
+    def to_arrow(self, include_source=False):
+        import numpy as np
+        import pyarrow as pa
+
+        def dictionary_array(codes, values):
+            codes = np.frombuffer(codes, dtype=np.int32)
+            indices = pa.array(codes, type=pa.int32(), mask=codes == MISSING)
+            return pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string()))
+
+        names = list(self.columns)
+        arrays = [dictionary_array(self.column_codes(name), self.columns[name].values) for name in names]
+        if include_source:
+            names.append(self.sources.name)
+            arrays.append(dictionary_array(self.source_codes(), self.sources.values))
+        return pa.Table.from_arrays(arrays, names=names)
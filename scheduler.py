@@ -0,0 +1,227 @@
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from output_files import atomic_write
+from scraper import DynamicContentScraper, run_job
+from utils import load_config
+
+STATE_FILE = 'schedule_state.json'
+# Seconds over which groups sharing a schedule are spread by default.
+DEFAULT_JITTER = 60
+CRON_FIELDS = [('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7)]
+
+
+def parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/')
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = map(int, part.split('-'))
+        else:
+            start = end = int(part)
+            if step > 1:
+                end = high
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    # Standard five-field cron: minute hour day month weekday (0 = Sunday).
+    # As in cron, a restricted day and weekday match if either one does.
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_cron_field(field, low, high) for field, (_, low, high) in zip(fields, CRON_FIELDS))
+        self.weekdays = {weekday % 7 for weekday in self.weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, timestamp):
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+
+class IntervalSchedule:
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Schedule interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, timestamp):
+        return timestamp + self.seconds
+
+
+class ScheduledGroup:
+    def __init__(self, spec, base_config):
+        self.name = spec['name']
+        if 'cron' in spec:
+            self.schedule = CronSchedule(spec['cron'])
+        else:
+            self.schedule = IntervalSchedule(spec['every'])
+        self.urls = spec.get('urls')
+        self.urls_file = spec.get('urls_file')
+        # A fixed per-group offset inside the jitter window: groups sharing
+        # a schedule are spread out, and each keeps the same slot every run.
+        # Groups get a window by default so they never all start in the
+        # same second; 'jitter': 0 turns it off for a group.
+        jitter = int(spec.get('jitter', base_config.get('schedule_jitter', self.default_jitter())))
+        self.offset = zlib.crc32(self.name.encode('utf-8')) % jitter if jitter > 0 else 0
+        overrides = {key: value for key, value in spec.items()
+                     if key not in ('name', 'cron', 'every', 'urls', 'urls_file', 'jitter')}
+        self.config = dict(base_config, **overrides)
+        self.config.setdefault('output_formats', ['db'])
+        self.signature = spec.get('cron') or spec.get('every')
+        self.task = None
+
+    def default_jitter(self):
+        # At most a tenth of a short interval, so the offset stays small
+        # next to the period.
+        if isinstance(self.schedule, IntervalSchedule):
+            return min(DEFAULT_JITTER, self.schedule.seconds // 10)
+        return DEFAULT_JITTER
+
+    def next_run(self, scheduled):
+        return self.schedule.next_after(scheduled) + self.offset
+
+    def first_run(self, now):
+        if isinstance(self.schedule, IntervalSchedule):
+            return now + self.offset
+        return self.next_run(now)
+
+    def job_config(self):
+        config = dict(self.config)
+        if self.urls_file:
+            with open(self.urls_file, 'r') as f:
+                config['urls'] = [url.strip() for url in f if url.strip()]
+        elif self.urls is not None:
+            config['urls'] = self.urls
+        return config
+
+
+class Scheduler:
+    def __init__(self, config, state_file=STATE_FILE):
+        self.groups = [ScheduledGroup(spec, config) for spec in config.get('schedules', [])]
+        self.state_file = state_file
+        self.state = self.load_state()
+        self.semaphore = asyncio.Semaphore(config.get('max_parallel_jobs', 1))
+
+    def load_state(self):
+        state = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        for entry in state.values():
+            # A run that was in progress when the process died.
+            if entry.get('status') == 'running':
+                entry['status'] = 'interrupted'
+        now = time.time()
+        for group in self.groups:
+            entry = state.setdefault(group.name, {'runs': 0, 'skipped': 0})
+            if entry.get('schedule') != group.signature:
+                entry.update(schedule=group.signature, next_run=group.first_run(now))
+        return state
+
+    def save_state(self):
+        with atomic_write(self.state_file) as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=4)
+
+    async def run_group(self, group):
+        entry = self.state[group.name]
+        async with self.semaphore:
+            entry.update(status='running', last_start=time.time())
+            self.save_state()
+            try:
+                config = await asyncio.to_thread(group.job_config)
+                scraper = DynamicContentScraper(config)
+                summary = await run_job(scraper, config)
+                entry.pop('error', None)
+                entry.update(status='finished', rows=len(scraper.data), duration=summary['duration'])
+                logging.info(f"Scheduled crawl {group.name} finished: {len(scraper.data)} rows")
+            except Exception as e:
+                logging.error(f"Scheduled crawl {group.name} failed: {e}")
+                entry.update(status='failed', error=str(e))
+            finally:
+                entry['runs'] = entry.get('runs', 0) + 1
+                entry['last_finish'] = time.time()
+                self.save_state()
+
+    def start_due(self, now):
+        for group in self.groups:
+            entry = self.state[group.name]
+            if entry['next_run'] > now:
+                continue
+            following = group.next_run(entry['next_run'] - group.offset)
+            if following <= now:
+                # Runs missed while the scheduler was down are not replayed
+                # one by one; the next one is counted from now.
+                following = group.next_run(now - group.offset)
+            entry['next_run'] = following
+            if group.task is not None and not group.task.done():
+                entry['skipped'] = entry.get('skipped', 0) + 1
+                logging.info(f"Skipping scheduled crawl {group.name}: previous run still in progress")
+                continue
+            group.task = asyncio.create_task(self.run_group(group))
+        self.save_state()
+
+    async def run(self):
+        if not self.groups:
+            logging.error("No schedules configured")
+            return
+        for group in self.groups:
+            logging.info(f"Schedule {group.name}: next run at {time.ctime(self.state[group.name]['next_run'])}")
+        while True:
+            self.start_due(time.time())
+            wake = min(self.state[group.name]['next_run'] for group in self.groups)
+            await asyncio.sleep(min(max(wake - time.time(), 0), 60))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run recurring crawls from the schedules in config.json")
+    parser.add_argument('--list', action='store_true', help="print the next run of every schedule and exit")
+    parser.add_argument('--state-file', default=STATE_FILE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    scheduler = Scheduler(load_config(), args.state_file)
+    if args.list:
+        for group in scheduler.groups:
+            entry = scheduler.state[group.name]
+            print(f"{group.name}: next run {time.ctime(entry['next_run'])}, last status {entry.get('status', '-')}")
+    else:
+        asyncio.run(scheduler.run())
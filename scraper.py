@@ -1,116 +1,597 @@
-
-import asyncio
-from playwright.async_api import async_playwright
-import pandas as pd
-import logging
-import random
-import json
-from bs4 import BeautifulSoup
-
-logging.basicConfig(level=logging.INFO)
-
-class DynamicContentScraper:
-    def __init__(self, config):
-        self.urls = config.get('urls', [])
-        self.data = []
-        self.proxy = config.get('proxy')
-        self.timeout = config.get('timeout', 120000)
-
-    async def fetch_page_source(self, page, url):
-        logging.info(f"Loading page: {url}")
-        try:
-            user_agent = random.choice([
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0"
-            ])
-            await page.set_extra_http_headers({"User-Agent": user_agent})
-            await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout)
-            await page.wait_for_load_state('networkidle')
-            return await page.content()
-        except Exception as e:
-            logging.error(f"Error loading page {url}: {e}")
-            return ""
-
-    def parse_data(self, html):
-        logging.info("Parsing data")
-        if not html:
-            logging.error("HTML is empty")
-            return
-
-        soup = BeautifulSoup(html, 'html.parser')
-        parsed_count = 0
-
-        table = soup.find('table')
-        if table:
-            headers = [header.text.strip() for header in table.find_all('th')]
-            for row in table.find_all('tr'):
-                cells = row.find_all('td')
-                if len(cells) == len(headers):
-                    row_data = {headers[i]: cells[i].text.strip() for i in range(len(headers))}
-                    self.data.append(row_data)
-                    parsed_count += 1
-        
-        logging.info(f"Found items: {parsed_count}")
-        logging.info(f"Current data: {self.data}")
-
-    async def scrape_page(self, page, url):
-        html = await self.fetch_page_source(page, url)
-        self.parse_data(html)
-
-    async def scrape(self, url):
-        async with async_playwright() as p:
-            launch_args = {'headless': True}
-            if self.proxy:
-                launch_args['proxy'] = {
-                    'server': self.proxy
-                }
-            try:
-                browser = await p.chromium.launch(**launch_args)
-                page = await browser.new_page()
-                await self.scrape_page(page, url)
-            except Exception as e:
-                logging.error(f"Error launching browser: {e}")
-            finally:
-                await browser.close()
-
-    async def run(self):
-        tasks = [self.scrape(url) for url in self.urls]
-        await asyncio.gather(*tasks)
-
-    def save_to_csv(self, filename):
-        logging.info(f"Saving data to {filename}")
-        if self.data:
-            df = pd.DataFrame(self.data)
-            df.to_csv(filename, index=False, encoding='utf-8')
-            logging.info(f"Data successfully saved to {filename}")
-        else:
-            logging.warning("No data to save.")
-
-    def save_to_json(self, filename):
-        logging.info(f"Saving data to {filename}")
-        if self.data:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=4)
-            logging.info(f"Data successfully saved to {filename}")
-        else:
-            logging.warning("No data to save.")
-
-    def save_to_excel(self, filename):
-        logging.info(f"Saving data to {filename}")
-        if self.data:
-            df = pd.DataFrame(self.data)
-            df.to_excel(filename, index=False, encoding='utf-8')
-            logging.info(f"Data successfully saved to {filename}")
-        else:
-            logging.warning("No data to save.")
-
-if __name__ == '__main__':
-    with open('config.json', 'r') as f:
-        config = json.load(f)
-    scraper = DynamicContentScraper(config)
-    asyncio.run(scraper.run())
-    scraper.save_to_csv('output.csv')
-    scraper.save_to_json('output.json')
-    scraper.save_to_excel('output.xlsx')
-    logging.info("Scraping completed")
+
+import argparse
+import asyncio
+from playwright.async_api import async_playwright
+import logging
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+from bs4 import BeautifulSoup
+import arrow_output
+from archive import ArchiveReader, ArchiveWriter
+from dedup import RowDeduplicator
+from deadlines import JobDeadline, current_deadline, timeout_ms, within
+from events import EventStream, ndjson_writer
+from governor import ResourceGovernor, child_pids
+from metrics import Metrics
+from output_files import atomic_path, atomic_write
+from profiles import ProfileStore
+from profiling import RunProfiler
+from results_db import ResultsStore
+from seeding import Seeder
+from singleflight import fetch_key, flights
+from proxies import ProxyPool
+from rowbuffer import RowBuffer
+from utils import url_host
+
+logging.basicConfig(level=logging.INFO)
+
+# Runs inside the page and mirrors extract_table(), so only the header and
+# cell strings cross the Playwright pipe instead of the serialized DOM.
+EXTRACT_TABLE_JS = """
+() => {
+    const table = document.querySelector('table');
+    if (!table) {
+        return {headers: [], rows: []};
+    }
+    const text = (el) => el.textContent.trim();
+    const headers = Array.from(table.querySelectorAll('th'), text);
+    const rows = [];
+    for (const row of table.querySelectorAll('tr')) {
+        const cells = row.querySelectorAll('td');
+        if (cells.length && cells.length === headers.length) {
+            rows.push(Array.from(cells, text));
+        }
+    }
+    return {headers, rows};
+}
+"""
+
+SKIPPED = 'skipped: job deadline'
+
+def extract_table(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table')
+    if not table:
+        return [], []
+    headers = [header.text.strip() for header in table.find_all('th')]
+    rows = []
+    for row in table.find_all('tr'):
+        cells = row.find_all('td')
+        if cells and len(cells) == len(headers):
+            rows.append([cell.text.strip() for cell in cells])
+    return headers, rows
+
+def write_json_records(f, records):
+    # Same layout as json.dump(list, indent=4), one record at a time so
+    # the whole list never has to exist in memory.
+    f.write('[')
+    separator = '\n'
+    for record in records:
+        f.write(separator)
+        f.write('    ' + json.dumps(record, ensure_ascii=False, indent=4).replace('\n', '\n    '))
+        separator = ',\n'
+    f.write('\n]' if separator != '\n' else ']')
+
+class DynamicContentScraper:
+    def __init__(self, config):
+        self.urls = config.get('urls', [])
+        self.data = RowBuffer(config.get('chunk_rows', 65536))
+        self.parquet_options = config.get('parquet', {})
+        self.key_columns = config.get('key_columns')
+        self.proxy = config.get('proxy')
+        self.proxy_pool = ProxyPool.from_config(config)
+        self.profiles = ProfileStore.from_config(config)
+        self.timeout = config.get('timeout', 120000)
+        # One budget (ms) for navigation, readiness and extraction of a page,
+        # and an optional deadline (s) for the whole run.
+        self.page_budget = config.get('page_budget', self.timeout)
+        self.job_deadline = config.get('job_deadline')
+        self.deadlines = JobDeadline(None, (self.page_budget or 0) / 1000)
+        self.semaphore = asyncio.Semaphore(config.get('concurrency', 4))
+        self.extract_mode = config.get('extract_mode', 'html')
+        self.singleflight = config.get('singleflight', True)
+        self.parse_in_thread = config.get('parse_in_thread', False)
+        self.metrics = Metrics()
+        self.events = EventStream(config.get('progress_interval', 0.5))
+        self.archive = ArchiveWriter.from_config(config)
+        self.dedup = RowDeduplicator.from_config(config)
+        self.page_responses = {}
+        if self.archive and self.extract_mode == 'dom':
+            logging.warning("Archiving needs the page HTML; pages extracted in 'dom' mode are not archived")
+        self.governor = ResourceGovernor.from_config(config)
+        self.playwright = None
+        self.browser = None
+        self.browser_pages = 0
+        self.browser_leases = {}
+        self.recycling = None
+        self.in_flight = 0
+        self.profiler = None
+
+    async def load_page(self, page, url):
+        logging.info(f"Loading page: {url}")
+        host = url_host(url)
+        try:
+            with self.metrics.timer('navigation', host):
+                response = await page.goto(url, wait_until='domcontentloaded', timeout=timeout_ms(self.timeout))
+            if self.archive and response:
+                self.page_responses[url] = (response.status, response.headers)
+            with self.metrics.timer('readiness', host):
+                await page.wait_for_load_state('networkidle', timeout=timeout_ms(self.timeout))
+            return True
+        except Exception as e:
+            logging.error(f"Error loading page {url}: {e}")
+            return False
+
+    async def fetch_page_source(self, page, url):
+        if not await self.load_page(page, url):
+            return ""
+        try:
+            with self.metrics.timer('content_fetch', url_host(url)):
+                html = await page.content()
+            self.metrics.inc('content_bytes_total', len(html), host=url_host(url))
+            return html
+        except Exception as e:
+            logging.error(f"Error loading page {url}: {e}")
+            return ""
+
+    def parse_data(self, html, url=None):
+        logging.info("Parsing data")
+        if not html:
+            logging.error("HTML is empty")
+            return
+
+        headers, rows = extract_table(html)
+        self.add_rows(headers, rows, url)
+
+    def add_rows(self, headers, rows, url=None):
+        found = len(rows)
+        if self.dedup:
+            rows = self.dedup.filter(headers, rows)
+        self.data.extend(headers, rows, url)
+        if url:
+            self.metrics.inc('rows_total', len(rows), host=url_host(url))
+            if found > len(rows):
+                self.metrics.inc('rows_duplicate_total', found - len(rows), host=url_host(url))
+
+        logging.info(f"Found items: {found}")
+        return len(rows)
+
+    async def fetch_table_rows(self, page, url):
+        if not await self.load_page(page, url):
+            return None
+        try:
+            with self.metrics.timer('content_fetch', url_host(url)):
+                return await page.evaluate(EXTRACT_TABLE_JS)
+        except Exception as e:
+            logging.error(f"Error extracting table from {url}: {e}")
+            return None
+
+    async def extract_page(self, page, url):
+        # Headers and rows of the page's table, or None if the page could
+        # not be loaded.
+        host = url_host(url)
+        if self.extract_mode == 'dom':
+            # A loaded page without a table is an empty table, as in html
+            # mode; None only when loading or evaluation failed.
+            table = await self.fetch_table_rows(page, url)
+            if table is None:
+                return None
+            return table['headers'], table['rows']
+        html = await self.fetch_page_source(page, url)
+        if not html:
+            return None
+        if self.archive:
+            await asyncio.to_thread(self.archive_page, url, html)
+        with self.metrics.timer('parse', host):
+            if self.parse_in_thread:
+                # Keeps the shared event loop responsive while BeautifulSoup runs.
+                return await asyncio.to_thread(self.parse_table, html, url)
+            return self.parse_table(html, url)
+
+    def parse_table(self, html, url):
+        with self.profile_parse(url):
+            return extract_table(html)
+
+    def archive_page(self, url, html):
+        status, headers = self.page_responses.pop(url, (None, None))
+        try:
+            self.archive.write(url, html, status, headers)
+        except Exception as e:
+            logging.error(f"Error archiving {url}: {e}")
+
+    def profile_parse(self, url):
+        if self.profiler:
+            return self.profiler.parse(url)
+        return nullcontext()
+
+    def profile_task(self, url):
+        if self.profiler:
+            return self.profiler.task(url)
+        return nullcontext()
+
+    async def launch_browser(self, p):
+        launch_args = {'headless': True}
+        if self.proxy_pool:
+            # Every context brings its own proxy; Chromium still needs a
+            # browser-level placeholder for per-context proxies to apply.
+            launch_args['proxy'] = {'server': 'http://per-context'}
+        return await p.chromium.launch(**launch_args)
+
+    async def scrape(self, url):
+        started = time.monotonic()
+        self.events.url_started(url)
+        if self.singleflight:
+            # A page already being fetched, by this run or another job in
+            # the process fetching it the same way, is not fetched again;
+            # its result is shared. Waiting for it is bound by the job
+            # deadline like any other page.
+            try:
+                (table, error), shared = await flights.do(self.flight_key(url), lambda: self.fetch(url),
+                                                          self.deadlines.remaining())
+                if shared and error == SKIPPED:
+                    # The other job ran out of time, not necessarily this one.
+                    (table, error), shared = await self.fetch(url), False
+            except asyncio.TimeoutError:
+                table, error, shared = None, 'job deadline exceeded', False
+                self.metrics.inc('page_deadline_exceeded_total', host=url_host(url))
+        else:
+            (table, error), shared = await self.fetch(url), False
+        host = url_host(url)
+        if shared:
+            self.metrics.inc('singleflight_coalesced_total', host=host)
+        rows = 0
+        if table is not None:
+            rows = self.add_rows(*table, url)
+        self.events.url_done(url, table is not None, rows, time.monotonic() - started, error)
+
+    def flight_key(self, url):
+        # Fetches are only shared between callers that would get the same
+        # result: same session profile, proxies, extraction mode, budget and
+        # archive.
+        profile = self.profiles.for_url(url)
+        proxies = None
+        if self.proxy_pool:
+            proxies = tuple(sorted((proxy.server, proxy.username or '') for proxy in self.proxy_pool.proxies))
+        archive = self.archive.directory if self.archive else None
+        return fetch_key(url, profile.name, profile.storage_state, proxies, self.extract_mode, self.page_budget,
+                         self.timeout, archive)
+
+    async def fetch(self, url):
+        # (headers, rows) or None, and the error if there was one.
+        host = url_host(url)
+        queued = time.perf_counter()
+        async with self.semaphore:
+            if self.governor:
+                # Checked once the page holds a slot, right before it opens:
+                # every task passes a check made before the semaphore at
+                # once, so a pause there would hold back nothing.
+                try:
+                    await asyncio.wait_for(self.governor.wait_for_capacity(), self.deadlines.remaining())
+                except asyncio.TimeoutError:
+                    pass
+            self.metrics.observe('queue_wait', host, time.perf_counter() - queued)
+            if not self.deadlines.can_start():
+                self.skip_page(url)
+                return None, SKIPPED
+            self.in_flight += 1
+            started = time.monotonic()
+            token = current_deadline.set(self.deadlines.page_deadline())
+            browser = None
+            try:
+                # Waiting for a browser relaunch is part of the page's budget.
+                browser = await self.lease_browser()
+                with self.profile_task(url):
+                    return await self.scrape_in_context(browser, url)
+            except asyncio.TimeoutError:
+                self.metrics.inc('page_deadline_exceeded_total', host=host)
+                self.metrics.inc('pages_total', host=host, status='error')
+                logging.error(f"Page budget exceeded for {url} while waiting for the browser")
+                return None, 'page deadline exceeded'
+            finally:
+                current_deadline.reset(token)
+                self.deadlines.record(time.monotonic() - started)
+                self.in_flight -= 1
+                if browser is not None:
+                    await self.release_browser(browser)
+
+    def skip_page(self, url):
+        # Not enough of the job deadline left for this page to finish.
+        self.deadlines.skipped += 1
+        self.metrics.inc('pages_skipped_total', host=url_host(url))
+
+    async def lease_browser(self):
+        if self.governor and self.recycling is None and self.governor.should_recycle(self.browser_pages):
+            self.recycling = asyncio.ensure_future(self.recycle_browser())
+        if self.recycling is not None:
+            # Shielded: the relaunch is shared by every page waiting for it
+            # and goes on when one of them runs out of budget.
+            await within(asyncio.shield(self.recycling))
+        self.browser_pages += 1
+        self.browser_leases[self.browser] = self.browser_leases.get(self.browser, 0) + 1
+        return self.browser
+
+    async def release_browser(self, browser):
+        self.browser_leases[browser] -= 1
+        if browser is not self.browser and not self.browser_leases[browser]:
+            del self.browser_leases[browser]
+            await browser.close()
+
+    async def recycle_browser(self):
+        # Pages already running finish on the old browser; it is closed by
+        # release_browser once the last of them is done.
+        old = self.browser
+        try:
+            self.browser = await self.launch_browser(self.playwright)
+        except Exception as e:
+            logging.error(f"Error relaunching browser, keeping the current one: {e}")
+            return
+        finally:
+            self.recycling = None
+        logging.info(f"Recycled browser after {self.browser_pages} pages")
+        self.browser_pages = 0
+        self.governor.recycled()
+        self.metrics.inc('browser_recycles_total')
+        if not self.browser_leases.get(old):
+            self.browser_leases.pop(old, None)
+            await old.close()
+
+    async def scrape_in_context(self, browser, url):
+        host = url_host(url)
+        acquire_started = time.perf_counter()
+        proxy = None
+        profile = self.profiles.for_url(url)
+        context_args = profile.context_args()
+        table = None
+        error = None
+        started = time.monotonic()
+        context = None
+        try:
+            if self.proxy_pool:
+                # A proxy cool-down can outlast the page budget.
+                proxy = await within(self.proxy_pool.acquire())
+                context_args['proxy'] = proxy.settings()
+                started = time.monotonic()
+            context = await browser.new_context(**context_args)
+            page = await context.new_page()
+            self.metrics.observe('browser_acquire', host, time.perf_counter() - acquire_started)
+            table = await within(self.extract_page(page, url))
+            if table is not None:
+                await profile.save(context)
+        except asyncio.TimeoutError:
+            error = 'page deadline exceeded'
+            self.metrics.inc('page_deadline_exceeded_total', host=host)
+            logging.error(f"Page budget exceeded for {url}")
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Error scraping {url}: {e}")
+        finally:
+            ok = table is not None
+            self.metrics.inc('pages_total', host=host, status='ok' if ok else 'error')
+            if context:
+                await context.close()
+            if proxy:
+                await self.proxy_pool.release(proxy, ok, time.monotonic() - started)
+        return table, error
+
+    async def run(self):
+        if self.profiler:
+            self.profiler.install(asyncio.get_running_loop())
+        try:
+            await self.crawl()
+        finally:
+            # Also when the driver or the browser failed to start.
+            if self.archive:
+                self.archive.close()
+            if self.dedup:
+                self.dedup.close()
+
+    async def crawl(self):
+        before = set(child_pids()) if self.governor else set()
+        async with async_playwright() as p:
+            self.playwright = p
+            # The driver started for this run: its process tree holds this
+            # scraper's browsers and nobody else's.
+            driver_pids = set(child_pids()) - before if self.governor else set()
+            try:
+                self.browser = await self.launch_browser(p)
+            except Exception as e:
+                logging.error(f"Error launching browser: {e}")
+                return
+            monitor = None
+            if self.governor:
+                monitor = asyncio.create_task(self.governor.run(lambda: self.in_flight, driver_pids))
+            # The job clock starts with the crawl, not when the scraper
+            # object was built.
+            self.deadlines = JobDeadline(self.job_deadline, (self.page_budget or 0) / 1000)
+            try:
+                self.events.run_started(len(self.urls))
+                tasks = [self.scrape(url) for url in self.urls]
+                await asyncio.gather(*tasks)
+            finally:
+                if monitor:
+                    monitor.cancel()
+                self.events.run_finished()
+                await self.profiles.flush()
+                for browser in set(self.browser_leases) | {self.browser}:
+                    await browser.close()
+                self.browser_leases.clear()
+        if self.proxy_pool:
+            logging.info(f"Proxy stats: {self.proxy_pool.stats()}")
+        if self.governor:
+            logging.info(f"Resource governor: {self.governor.stats()}")
+        if self.deadlines.skipped:
+            logging.warning(f"Job deadline reached: {self.deadlines.skipped} pages were not started")
+
+    def save_to_csv(self, filename):
+        logging.info(f"Saving data to {filename}")
+        if self.data:
+            with self.metrics.timer('write', 'all'):
+                df = self.data.to_pandas()
+                with atomic_write(filename, newline='') as f:
+                    df.to_csv(f, index=False)
+            logging.info(f"Data successfully saved to {filename}")
+        else:
+            logging.warning("No data to save.")
+
+    def save_to_json(self, filename):
+        logging.info(f"Saving data to {filename}")
+        if self.data:
+            with self.metrics.timer('write', 'all'):
+                with atomic_write(filename) as f:
+                    write_json_records(f, self.data.records())
+            logging.info(f"Data successfully saved to {filename}")
+        else:
+            logging.warning("No data to save.")
+
+    def save_to_excel(self, filename):
+        logging.info(f"Saving data to {filename}")
+        if self.data:
+            with self.metrics.timer('write', 'all'):
+                df = self.data.to_pandas()
+                # to_excel has no encoding argument; xlsx is always UTF-8.
+                with atomic_path(filename) as tmp_path:
+                    df.to_excel(tmp_path, index=False)
+            logging.info(f"Data successfully saved to {filename}")
+        else:
+            logging.warning("No data to save.")
+
+    def save_to_parquet(self, filename):
+        self.save_columnar(arrow_output.save_to_parquet, filename)
+
+    def save_to_arrow(self, filename):
+        self.save_columnar(arrow_output.save_to_arrow, filename)
+
+    def save_columnar(self, writer, filename):
+        logging.info(f"Saving data to {filename}")
+        if self.data:
+            try:
+                with self.metrics.timer('write', 'all'):
+                    crawl_date = time.strftime('%Y-%m-%d', time.localtime(self.metrics.started))
+                    writer(self.data, filename, self.parquet_options, crawl_date)
+                logging.info(f"Data successfully saved to {filename}")
+            except Exception as e:
+                logging.error(f"Error saving data to {filename}: {e}")
+        else:
+            logging.warning("No data to save.")
+
+    def save_to_database(self, filename):
+        logging.info(f"Saving data to {filename}")
+        try:
+            store = ResultsStore(filename)
+            run_id = store.start_run(self.metrics.started)
+            with self.metrics.timer('write', 'all'):
+                count = store.upsert(run_id, self.data.records(with_source=True), self.key_columns)
+            store.finish_run(run_id, rows=count)
+            store.close()
+            logging.info(f"Data successfully saved to {filename} (run {run_id}, {count} rows)")
+        except Exception as e:
+            logging.error(f"Error saving data to {filename}: {e}")
+
+OUTPUTS = {
+    'csv': ('save_to_csv', 'output.csv'),
+    'json': ('save_to_json', 'output.json'),
+    'xlsx': ('save_to_excel', 'output.xlsx'),
+    'parquet': ('save_to_parquet', 'output.parquet'),
+    'arrow': ('save_to_arrow', 'output.arrow'),
+    'db': ('save_to_database', 'results.db'),
+}
+
+def write_outputs(scraper, config):
+    for output in config.get('output_formats', ['csv', 'json', 'xlsx', 'db']):
+        method, filename = OUTPUTS[output]
+        getattr(scraper, method)(filename)
+    summary = scraper.metrics.dump(config.get('metrics_file', 'metrics.json'))
+    if scraper.dedup:
+        logging.info(f"Deduplication: {scraper.dedup.stats()}")
+        scraper.dedup.close()
+    if scraper.profiler:
+        scraper.profiler.write_reports()
+    return summary
+
+replay_readers = {}
+
+def parse_archived(directory, locations):
+    # Runs in a replay worker process; each worker keeps its own reader.
+    reader = replay_readers.get(directory)
+    if reader is None:
+        reader = replay_readers[directory] = ArchiveReader(directory)
+    results = []
+    for segment, offset, length in locations:
+        record = reader.read_at(segment, offset, length)
+        headers, rows = extract_table(record['html'])
+        results.append((record['url'], headers, rows))
+    return results
+
+def replay_archive(scraper, directory='archive', workers=None, batch_size=200, since=None):
+    # Re-runs extraction over archived pages with no browser and no
+    # network, spread over all cores.
+    reader = ArchiveReader(directory)
+    try:
+        locations = reader.locations(since)
+    finally:
+        reader.close()
+    logging.info(f"Replaying {len(locations)} archived pages from {directory}")
+    batches = [locations[i:i + batch_size] for i in range(0, len(locations), batch_size)]
+    scraper.events.run_started(len(locations))
+    with ProcessPoolExecutor(workers) as executor:
+        for results in executor.map(parse_archived, repeat(directory), batches):
+            for url, headers, rows in results:
+                added = scraper.add_rows(headers, rows, url)
+                scraper.metrics.inc('pages_total', host=url_host(url), status='ok')
+                scraper.events.url_done(url, True, added, 0.0)
+    scraper.events.run_finished()
+
+async def run_job(scraper, config):
+    # In-process entry point for servers sharing the scraper's event loop:
+    # the crawl runs on the loop, the blocking writers in a thread.
+    seeder = Seeder.from_config(config)
+    if seeder:
+        scraper.urls = await asyncio.to_thread(seeder.extend, scraper.urls)
+        seeder.track(scraper.events)
+    await scraper.run()
+    summary = await asyncio.to_thread(write_outputs, scraper, config)
+    if seeder:
+        await asyncio.to_thread(seeder.finish)
+    return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('proxies', nargs='*')
+    parser.add_argument('--profile', action='store_true', help="write parse, task and memory profiles for this run")
+    parser.add_argument('--profile-dir', default='reports')
+    parser.add_argument('--events', action='store_true', help="write progress events as JSON lines to stdout")
+    parser.add_argument('--replay', nargs='?', const='archive', metavar='ARCHIVE_DIR',
+                        help="re-extract pages from the archive instead of crawling")
+    parser.add_argument('--workers', type=int, default=None, help="replay worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+    # Proxies passed on the command line (see run_scraper in api.py/cli.py)
+    # take precedence over the ones stored in config.json.
+    if args.proxies:
+        config['proxies'] = args.proxies
+    if args.replay:
+        # Replay only reads the archive; it must not start a new segment.
+        config['archive'] = None
+    seeder = None if args.replay else Seeder.from_config(config)
+    if seeder:
+        config['urls'] = seeder.extend(config.get('urls', []))
+    scraper = DynamicContentScraper(config)
+    if seeder:
+        seeder.track(scraper.events)
+    if args.profile:
+        scraper.profiler = RunProfiler(args.profile_dir, config.get('slow_callback_duration', 0.1))
+    if args.events:
+        scraper.events.subscribe(ndjson_writer())
+    if args.replay:
+        replay_archive(scraper, args.replay, args.workers)
+    else:
+        asyncio.run(scraper.run(), debug=args.profile)
+    write_outputs(scraper, config)
+    if seeder:
+        seeder.finish()
+    logging.info("Scraping completed")
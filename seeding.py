@@ -0,0 +1,275 @@
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from events import URL_FINISHED
+from url_import import GZIP_MAGIC, PrefixedStream
+from utils import normalize_url
+
+SEEDING_DEFAULTS = {
+    # Sites whose robots.txt lists their sitemaps (or /sitemap.xml when it
+    # lists none), and sitemaps to read directly.
+    'sites': [],
+    'sitemaps': [],
+    'state_file': 'seeding.db',
+    # Seconds a parsed sitemap is reused without asking the server again.
+    'cache_ttl': 3600,
+    'timeout': 30,
+    'user_agent': 'my_scraper',
+    'respect_robots': True,
+    # Guards against sitemap indexes that point at each other or at a huge
+    # number of children.
+    'max_sitemaps': 1000,
+}
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(text):
+    # W3C datetime as used by sitemaps: a date, or a date and time with an
+    # offset. Returns a timestamp, or None when absent or malformed.
+    if not text:
+        return None
+    text = text.strip().replace('Z', '+00:00')
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def open_binary(stream):
+    prefix = stream.read(2)
+    binary = io.BufferedReader(PrefixedStream(prefix, stream), buffer_size=1 << 16)
+    if prefix == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=binary)
+    return binary
+
+
+def iter_sitemap(stream):
+    # Yields ('url' | 'sitemap', loc, lastmod) without building the tree:
+    # each entry is dropped from the root as soon as it has been read, so a
+    # 50k-entry sitemap never sits in memory.
+    root = None
+    for event, element in ET.iterparse(open_binary(stream), events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            continue
+        kind = local_name(element.tag)
+        if kind not in ('url', 'sitemap'):
+            continue
+        loc = lastmod = None
+        for child in element:
+            name = local_name(child.tag)
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = parse_lastmod(child.text)
+        if loc:
+            yield kind, loc, lastmod
+        root.clear()
+
+
+def sitemap_rows(sitemap, stream):
+    # Stored canonical so pages join against the URLs recorded as crawled.
+    for kind, loc, lastmod in iter_sitemap(stream):
+        url = normalize_url(loc)
+        if url:
+            yield sitemap, kind, url, lastmod
+
+
+def open_store(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS sitemaps (
+            url TEXT PRIMARY KEY, fetched_at REAL, etag TEXT, last_modified TEXT, entries INTEGER);
+        CREATE TABLE IF NOT EXISTS entries (sitemap TEXT, kind TEXT, url TEXT, lastmod REAL);
+        CREATE INDEX IF NOT EXISTS entries_sitemap ON entries (sitemap, kind);
+        CREATE TABLE IF NOT EXISTS crawled (url TEXT PRIMARY KEY, crawled_at REAL);
+    """)
+    return conn
+
+
+class Seeder:
+    # Turns robots.txt and sitemaps into the list of pages worth crawling:
+    # pages whose lastmod is newer than their last successful crawl, or
+    # that have no lastmod or were never crawled.
+    def __init__(self, sites=(), sitemaps=(), state_file='seeding.db', cache_ttl=3600, timeout=30,
+                 user_agent='my_scraper', respect_robots=True, max_sitemaps=1000):
+        self.sites = list(sites)
+        self.sitemaps = list(sitemaps)
+        self.state_file = state_file
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.respect_robots = respect_robots
+        self.max_sitemaps = max_sitemaps
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+        self.robots = {}
+        self.crawled = set()
+        self.started = None
+        self.counters = {'sitemaps_fetched': 0, 'sitemaps_cached': 0, 'pages': 0, 'unchanged': 0,
+                         'disallowed': 0, 'selected': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        options = config.get('seeding')
+        if not options:
+            return None
+        options = dict(SEEDING_DEFAULTS, **options)
+        return cls(**options)
+
+    def robots_for(self, url):
+        site = urljoin(url, '/')
+        parser = self.robots.get(site)
+        if parser is None:
+            parser = RobotFileParser(urljoin(site, 'robots.txt'))
+            try:
+                response = self.session.get(parser.url, timeout=self.timeout)
+                if response.status_code >= 400:
+                    # No robots.txt: everything is allowed.
+                    parser.parse([])
+                else:
+                    parser.parse(response.text.splitlines())
+            except Exception as e:
+                logging.error(f"Error fetching {parser.url}: {e}")
+                parser.parse([])
+            self.robots[site] = parser
+        return parser
+
+    def site_sitemaps(self, site):
+        return self.robots_for(site).site_maps() or [urljoin(site, '/sitemap.xml')]
+
+    def load_sitemap(self, conn, url, lastmod=None):
+        cached = conn.execute("SELECT fetched_at, etag, last_modified FROM sitemaps WHERE url = ?",
+                              (url,)).fetchone()
+        if cached:
+            fetched_at, etag, last_modified = cached
+            # An index entry saying the child has not changed since it was
+            # fetched is as good as an unexpired TTL.
+            if time.time() - fetched_at < self.cache_ttl or (lastmod is not None and lastmod <= fetched_at):
+                self.counters['sitemaps_cached'] += 1
+                return
+        headers = {}
+        if cached and cached[1]:
+            headers['If-None-Match'] = cached[1]
+        if cached and cached[2]:
+            headers['If-Modified-Since'] = cached[2]
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    with conn:
+                        conn.execute("UPDATE sitemaps SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                    self.counters['sitemaps_cached'] += 1
+                    return
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with conn:
+                    # Replaced in one transaction: a failed fetch keeps the
+                    # previous entries.
+                    conn.execute("DELETE FROM entries WHERE sitemap = ?", (url,))
+                    cursor = conn.executemany("INSERT INTO entries (sitemap, kind, url, lastmod) VALUES (?, ?, ?, ?)",
+                                              sitemap_rows(url, response.raw))
+                    conn.execute("INSERT OR REPLACE INTO sitemaps VALUES (?, ?, ?, ?, ?)",
+                                 (url, time.time(), response.headers.get('ETag'),
+                                  response.headers.get('Last-Modified'), cursor.rowcount))
+            self.counters['sitemaps_fetched'] += 1
+        except Exception as e:
+            logging.error(f"Error reading sitemap {url}: {e}")
+
+    def walk(self, conn):
+        pending = [(url, None) for url in self.sitemaps]
+        for site in self.sites:
+            pending.extend((url, None) for url in self.site_sitemaps(site))
+        seen = set()
+        while pending and len(seen) < self.max_sitemaps:
+            url, lastmod = pending.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            self.load_sitemap(conn, url, lastmod)
+            pending.extend(conn.execute("SELECT url, lastmod FROM entries WHERE sitemap = ? AND kind = 'sitemap'",
+                                        (url,)).fetchall())
+        if pending:
+            logging.warning(f"Stopped after {self.max_sitemaps} sitemaps; {len(pending)} were not read")
+        return seen
+
+    def seeds(self):
+        conn = open_store(self.state_file)
+        selected = {}
+        try:
+            for sitemap in self.walk(conn):
+                rows = conn.execute("""
+                    SELECT e.url, e.lastmod, c.crawled_at FROM entries e LEFT JOIN crawled c ON c.url = e.url
+                    WHERE e.sitemap = ? AND e.kind = 'url'""", (sitemap,))
+                for url, lastmod, crawled_at in rows:
+                    self.counters['pages'] += 1
+                    if crawled_at is not None and lastmod is not None and lastmod <= crawled_at:
+                        self.counters['unchanged'] += 1
+                        continue
+                    if self.respect_robots and not self.robots_for(url).can_fetch(self.user_agent, url):
+                        self.counters['disallowed'] += 1
+                        continue
+                    selected[url] = None
+        finally:
+            conn.close()
+        self.counters['selected'] = len(selected)
+        logging.info(f"Seeding: {self.counters}")
+        return list(selected)
+
+    def extend(self, urls):
+        return list(dict.fromkeys(list(urls) + self.seeds()))
+
+    def track(self, events):
+        # Pages are marked crawled as of the start of the run, so a page
+        # changed while it was being crawled is picked up next time.
+        self.started = time.time()
+
+        def listener(event):
+            if event['type'] == URL_FINISHED:
+                self.crawled.add(normalize_url(event['url']) or event['url'])
+        events.subscribe(listener)
+
+    def finish(self):
+        if not self.crawled:
+            return
+        conn = open_store(self.state_file)
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO crawled VALUES (?, ?)",
+                                 ((url, self.started) for url in self.crawled))
+        finally:
+            conn.close()
+        self.crawled = set()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List the pages the next crawl would add from sitemaps")
+    parser.add_argument('--config', default='config.json')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.config, 'r') as f:
+        seeder = Seeder.from_config(json.load(f))
+    if seeder is None:
+        raise SystemExit("No 'seeding' section in the config")
+    for url in seeder.seeds():
+        print(url)
@@ -0,0 +1,54 @@
+
+import asyncio
+
+from metrics import counters_summary
+from utils import normalize_url
+
+
+def fetch_key(url, *variant):
+    # The canonical URL plus everything else that changes what the fetch
+    # returns (profile, proxies, extraction mode, budget...).
+    return (normalize_url(url) or url,) + variant
+
+
+class SingleFlight:
+    # Concurrent callers asking for the same key share one execution and
+    # its result (or exception). Tasks belong to one event loop, so calls
+    # are only shared between callers on the same loop.
+    def __init__(self):
+        self.calls = {}
+        self.counters = {'calls': 0, 'executions': 0, 'coalesced': 0}
+
+    async def do(self, key, function, timeout=None):
+        # Returns (result, shared); function is a coroutine function run
+        # only by the first caller. A caller that stops waiting after
+        # timeout seconds gets asyncio.TimeoutError; the call goes on for
+        # the others.
+        loop_key = (id(asyncio.get_running_loop()), key)
+        self.counters['calls'] += 1
+        task = self.calls.get(loop_key)
+        shared = task is not None
+        if shared:
+            self.counters['coalesced'] += 1
+        else:
+            self.counters['executions'] += 1
+            task = self.calls[loop_key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self.forget(loop_key, done))
+        # Shielded: a caller that is cancelled must not cancel the work
+        # others are waiting on.
+        return await asyncio.wait_for(asyncio.shield(task), timeout), shared
+
+    def forget(self, loop_key, task):
+        if self.calls.get(loop_key) is task:
+            del self.calls[loop_key]
+        if not task.cancelled():
+            # Marks the exception as retrieved when every waiter is gone.
+            task.exception()
+
+    def counters_summary(self, prefix='shared_fetch'):
+        return counters_summary(self.counters, prefix)
+
+
+# Shared by every scraper, job and warm pool in the process, so concurrent
+# jobs (ASGI, scheduler) asking for the same page fetch it once.
+flights = SingleFlight()
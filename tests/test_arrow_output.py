@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rowbuffer import RowBuffer
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+from arrow_output import save_to_parquet
+
+
+def make_buffer(rows=15):
+    buffer = RowBuffer()
+    buffer.extend(['a', 'b'], [[str(i), 'x'] for i in range(rows)], 'http://example.com/page')
+    return buffer
+
+
+def test_partitioned_rerun_replaces_partitions(tmp_path):
+    path = str(tmp_path / 'output.parquet')
+    options = {'partition_by': ['host', 'crawl_date']}
+    save_to_parquet(make_buffer(), path, options, crawl_date='2024-01-01')
+    save_to_parquet(make_buffer(), path, options, crawl_date='2024-01-01')
+    assert pq.read_table(path).num_rows == 15
+    save_to_parquet(make_buffer(5), path, options, crawl_date='2024-01-02')
+    assert pq.read_table(path).num_rows == 20
+
+
+def test_single_file_round_trip(tmp_path):
+    path = str(tmp_path / 'output.parquet')
+    save_to_parquet(make_buffer(), path)
+    table = pq.read_table(path)
+    assert table.num_rows == 15
+    assert table.column('host').to_pylist()[0] == 'example.com'
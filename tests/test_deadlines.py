@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlines import Deadline, JobDeadline, current_deadline, timeout_ms, within
+
+
+def test_page_deadline_never_outlives_the_job():
+    assert JobDeadline(None, 5).page_deadline().remaining() == pytest.approx(5, abs=0.1)
+    assert JobDeadline(2, 5).page_deadline().remaining() == pytest.approx(2, abs=0.1)
+    assert JobDeadline(None, None).page_deadline().remaining() is None
+
+
+def test_can_start_once_pages_are_known_to_fit():
+    job = JobDeadline(1, min_samples=3)
+    assert job.can_start()
+    for _ in range(3):
+        job.record(0.2)
+    assert job.can_start()
+    for _ in range(10):
+        job.record(30)
+    assert not job.can_start()
+    assert not JobDeadline(0).can_start()
+
+
+def test_timeout_ms_and_within_use_the_current_deadline():
+    async def main():
+        assert timeout_ms(1234) == 1234
+        token = current_deadline.set(Deadline(0.05))
+        try:
+            assert 1 <= timeout_ms(1234) <= 50
+            with pytest.raises(asyncio.TimeoutError):
+                await within(asyncio.sleep(1))
+        finally:
+            current_deadline.reset(token)
+        assert await within(asyncio.sleep(0, 'done')) == 'done'
+
+    asyncio.run(main())
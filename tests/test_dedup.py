@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import RowDeduplicator
+
+
+def test_rows_seen_on_earlier_pages_are_dropped():
+    dedup = RowDeduplicator(keys=['id'])
+    assert dedup.filter(['id', 'name'], [['1', 'a'], ['2', 'b'], ['1', 'c']]) == [['1', 'a'], ['2', 'b']]
+    # Key columns are found by name, whatever their position on the page.
+    assert dedup.filter(['name', 'id'], [['z', '2'], ['y', '3'], ['x', '']]) == [['y', '3'], ['x', '']]
+    assert dedup.stats()['duplicates'] == 2
+
+
+def test_keys_spill_to_disk_and_are_still_found(tmp_path):
+    dedup = RowDeduplicator(memory_keys=3, directory=str(tmp_path))
+    assert len(dedup.filter(['a'], [[str(i)] for i in range(5)])) == 5
+    assert dedup.index is not None and dedup.stats()['keys_in_memory'] == 0
+    assert dedup.filter(['a'], [['4'], ['5'], ['0']]) == [['5']]
+    index_file = dedup.index_file
+    dedup.close()
+    assert not os.path.exists(index_file)
+
+
+def test_from_config_is_off_by_default():
+    assert RowDeduplicator.from_config({}) is None
+    assert RowDeduplicator.from_config({'dedup': {'keys': ['id']}}).keys == ['id']
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asgi_api
+from live_scrape import ScrapeError, WarmPool, parse_max_age
+
+
+@pytest.mark.parametrize('value', [-1, 'soon', True, [], float('inf')])
+def test_parse_max_age_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        parse_max_age(value)
+
+
+def test_parse_max_age_accepts_seconds():
+    assert parse_max_age(None) is None
+    assert parse_max_age(0) == 0
+    assert parse_max_age('2.5') == 2.5
+
+
+def test_proxy_wait_is_bounded_by_the_page_budget(tmp_path):
+    async def main():
+        pool = WarmPool({'profiles_dir': str(tmp_path), 'proxies': ['http://proxy:1'], 'page_budget': 100})
+        for proxy in pool.scraper.proxy_pool.proxies:
+            proxy.cooldown_until = time.monotonic() + 60
+        started = time.monotonic()
+        with pytest.raises(ScrapeError):
+            await pool.scrape('http://example.com/')
+        assert time.monotonic() - started < 5
+
+    asyncio.run(main())
+
+
+class StuckPool:
+    async def scrape(self, url, max_age=None):
+        await asyncio.sleep(60)
+
+    def lookup_timeout(self):
+        return 0.1
+
+
+@pytest.fixture
+def asgi_client(monkeypatch):
+    from starlette.testclient import TestClient
+
+    async def get_warm_pool():
+        return StuckPool()
+
+    monkeypatch.setattr(asgi_api, 'get_warm_pool', get_warm_pool)
+    return TestClient(asgi_api.app)
+
+
+def test_asgi_scrape_times_out_with_504(asgi_client):
+    response = asgi_client.post('/scrape', json={'url': 'http://example.com/'})
+    assert response.status_code == 504
+
+
+def test_asgi_scrape_rejects_bad_max_age(asgi_client):
+    response = asgi_client.post('/scrape', json={'url': 'http://example.com/', 'max_age': -5})
+    assert response.status_code == 400
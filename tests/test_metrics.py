@@ -0,0 +1,19 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics, render_prometheus
+
+
+def test_dump_replaces_file_without_leftovers(tmp_path):
+    path = tmp_path / 'metrics.json'
+    path.write_text('{"counters": [')
+    metrics = Metrics()
+    metrics.inc('pages_total', host='example.com', status='ok')
+    metrics.observe('parse', 'example.com', 0.2)
+    summary = metrics.dump(str(path))
+    assert json.loads(path.read_text(encoding='utf-8')) == summary
+    assert os.listdir(tmp_path) == ['metrics.json']
+    assert 'scraper_pages_total{host="example.com",status="ok"} 1' in render_prometheus(summary)
@@ -0,0 +1,52 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiles import SessionProfile, merge_storage_state
+
+
+def cookie(name, value, expires=-1, domain='example.com'):
+    return {'name': name, 'value': value, 'domain': domain, 'path': '/', 'expires': expires}
+
+
+class FakeContext:
+    def __init__(self, state):
+        self.state = state
+
+    async def storage_state(self):
+        return self.state
+
+
+def test_merge_keeps_cookies_from_both_snapshots(tmp_path):
+    path = str(tmp_path / 'profile.json')
+    later = time.time() + 3600
+    merge_storage_state(path, {'cookies': [cookie('a', '1', later), cookie('gone', 'x', time.time() - 1)],
+                               'origins': [{'origin': 'https://example.com', 'localStorage': []}]})
+    # A stale copy of 'a' (earlier expiry) does not replace the refreshed one.
+    merged = merge_storage_state(path, {'cookies': [cookie('a', 'old', later - 60), cookie('b', '2')],
+                                        'origins': [{'origin': 'https://other.com', 'localStorage': []}]})
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == merged
+    assert {c['name']: c['value'] for c in merged['cookies']} == {'a': '1', 'b': '2'}
+    assert sorted(o['origin'] for o in merged['origins']) == ['https://example.com', 'https://other.com']
+
+
+def test_save_writes_at_most_once_per_interval(tmp_path):
+    async def main():
+        path = str(tmp_path / 'profile.json')
+        profile = SessionProfile('test', storage_state=path, save_interval=60)
+        await profile.save(FakeContext({'cookies': [cookie('a', '1')], 'origins': []}))
+        await profile.save(FakeContext({'cookies': [cookie('b', '2')], 'origins': []}))
+        with open(path, encoding='utf-8') as f:
+            assert [c['name'] for c in json.load(f)['cookies']] == ['a']
+        # New contexts start from everything saved so far.
+        assert [c['name'] for c in profile.context_args()['storage_state']['cookies']] == ['a', 'b']
+        await profile.flush()
+        with open(path, encoding='utf-8') as f:
+            assert [c['name'] for c in json.load(f)['cookies']] == ['a', 'b']
+
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+import asgi_api
+from results_db import ResultsStore
+
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ResultsStore()
+    store.upsert(store.start_run(), [('http://example.com/', {'n': str(i)}) for i in range(5)], ['n'])
+    store.close()
+    return tmp_path
+
+
+@pytest.mark.parametrize('limit, expected', [('0', 1), ('-1', 1), ('2', 2), ('5000', 5)])
+def test_flask_results_limit_is_bounded(results_dir, limit, expected):
+    response = api.app.test_client().get(f'/results?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.get_json()['results']) == expected
+
+
+@pytest.mark.parametrize('limit, expected', [('0', 1), ('-1', 1), ('2', 2), ('5000', 5)])
+def test_asgi_results_limit_is_bounded(results_dir, limit, expected):
+    from starlette.testclient import TestClient
+
+    response = TestClient(asgi_api.app).get(f'/results?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == expected
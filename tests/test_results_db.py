@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results_db import MAX_LIMIT, ResultsStore
+
+
+def make_store(tmp_path, rows=5):
+    store = ResultsStore(str(tmp_path / 'results.db'))
+    run_id = store.start_run()
+    store.upsert(run_id, [('http://example.com/', {'n': str(i)}) for i in range(rows)], ['n'])
+    return store, run_id
+
+
+def test_upsert_updates_existing_rows(tmp_path):
+    store, first = make_store(tmp_path)
+    second = store.start_run()
+    store.upsert(second, [('http://example.com/', {'n': '0'}), ('http://example.com/', {'n': '9'})], ['n'])
+    assert store.count() == 6
+    assert store.count(run_id=second) == 2
+    items, _ = store.query(filters={'n': '0'})
+    assert items[0]['last_run'] == second
+    store.close()
+
+
+def test_keyset_pagination_visits_every_row_once(tmp_path):
+    store, run_id = make_store(tmp_path)
+    seen = []
+    after = 0
+    while True:
+        items, cursor = store.query(run_id=run_id, after=after, limit=2)
+        seen.extend(item['data']['n'] for item in items)
+        if cursor is None:
+            break
+        after = cursor
+    assert seen == ['0', '1', '2', '3', '4']
+    assert [item['data']['n'] for item in store.iter_results(batch_size=2)] == seen
+    store.close()
+
+
+def test_query_clamps_limit(tmp_path):
+    store, _ = make_store(tmp_path, rows=MAX_LIMIT + 5)
+    items, cursor = store.query(limit=0)
+    assert len(items) == 1 and cursor == items[0]['id']
+    items, _ = store.query(limit=-1)
+    assert len(items) == 1
+    items, _ = store.query(limit=MAX_LIMIT * 10)
+    assert len(items) == MAX_LIMIT
+    items, cursor = store.query(after=10 ** 9)
+    assert items == [] and cursor is None
+    store.close()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rowbuffer import RowBuffer
+
+
+def test_extend_with_repeated_headers_keeps_last_cell():
+    buffer = RowBuffer()
+    buffer.extend(['a', '', ''], [['1', 'x', 'y'], ['2', 'p', 'q']])
+    buffer.extend(['a', 'b'], [['3', 'z']])
+    assert list(buffer.records()) == [
+        {'a': '1', '': 'y'},
+        {'a': '2', '': 'q'},
+        {'a': '3', 'b': 'z'},
+    ]
+    assert len(buffer.to_pandas()) == 3
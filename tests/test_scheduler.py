@@ -0,0 +1,50 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import CronSchedule, ScheduledGroup, parse_cron_field
+
+
+def next_after(expression, moment):
+    return datetime.fromtimestamp(CronSchedule(expression).next_after(moment.timestamp()))
+
+
+def test_parse_cron_field():
+    assert parse_cron_field('*/15', 0, 59) == {0, 15, 30, 45}
+    assert parse_cron_field('1-3,10', 0, 59) == {1, 2, 3, 10}
+    assert parse_cron_field('50/5', 0, 59) == {50, 55}
+
+
+@pytest.mark.parametrize('field', ['60', '5-1', '*/0', 'x'])
+def test_parse_cron_field_rejects_invalid(field):
+    with pytest.raises(ValueError):
+        parse_cron_field(field, 0, 59)
+
+
+def test_next_after():
+    start = datetime(2024, 1, 31, 23, 58, 30)
+    assert next_after('*/5 * * * *', start) == datetime(2024, 2, 1, 0, 0)
+    assert next_after('30 2 * * *', start) == datetime(2024, 2, 1, 2, 30)
+    assert next_after('0 0 29 2 *', start) == datetime(2024, 2, 29, 0, 0)
+    # 2024-02-05 is a Monday; 7 is Sunday as well as 0.
+    assert next_after('0 9 * * 1', start) == datetime(2024, 2, 5, 9, 0)
+    assert next_after('0 9 * * 7', start) == datetime(2024, 2, 4, 9, 0)
+    # Day and weekday both restricted: either one matching is enough.
+    assert next_after('0 9 15 * 1', start) == datetime(2024, 2, 5, 9, 0)
+
+
+def test_cron_expression_needs_five_fields():
+    with pytest.raises(ValueError):
+        CronSchedule('* * * *')
+
+
+def test_groups_keep_a_fixed_offset_inside_the_jitter_window():
+    group = ScheduledGroup({'name': 'prices', 'every': 3600}, {})
+    assert 0 <= group.offset < 60
+    assert ScheduledGroup({'name': 'prices', 'every': 3600}, {}).offset == group.offset
+    assert ScheduledGroup({'name': 'prices', 'every': 3600, 'jitter': 0}, {}).offset == 0
+    assert ScheduledGroup({'name': 'prices', 'every': 100}, {}).offset < 10
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper as scraper_module
+from scraper import DynamicContentScraper
+
+TABLE = '<table><tr><th>a</th></tr><tr><td>1</td></tr></table>'
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def goto(self, url, **kwargs):
+        self.browser.opened.append(url)
+        await self.browser.release.wait()
+
+    async def wait_for_load_state(self, *args, **kwargs):
+        pass
+
+    async def content(self):
+        return TABLE
+
+    async def evaluate(self, script):
+        return {'headers': ['a'], 'rows': [['1']]}
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def storage_state(self):
+        return {'cookies': [], 'origins': []}
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    # Pages block in goto() until release is set.
+    def __init__(self):
+        self.opened = []
+        self.release = asyncio.Event()
+
+    async def new_context(self, **kwargs):
+        return FakeContext(self)
+
+    async def close(self):
+        pass
+
+
+def make_scraper(tmp_path, urls, **config):
+    scraper = DynamicContentScraper(dict({'urls': urls, 'profiles_dir': str(tmp_path)}, **config))
+    scraper.browser = FakeBrowser()
+    return scraper
+
+
+def test_paused_governor_stops_new_pages(tmp_path):
+    async def main():
+        urls = [f'http://example.com/{i}' for i in range(12)]
+        scraper = make_scraper(tmp_path, urls, concurrency=2, singleflight=False, governor={'interval': 60})
+        browser = scraper.browser
+        crawl = asyncio.ensure_future(asyncio.gather(*[scraper.scrape(url) for url in urls]))
+        while len(browser.opened) < 2:
+            await asyncio.sleep(0.01)
+        scraper.governor.resumed.clear()
+        browser.release.set()
+        await asyncio.sleep(0.1)
+        assert len(browser.opened) == 2
+        scraper.governor.resumed.set()
+        await crawl
+        assert len(browser.opened) == 12
+        assert len(scraper.data) == 12
+
+    asyncio.run(main())
+
+
+def test_jobs_share_fetches_only_when_fetching_the_same_way(tmp_path):
+    async def main():
+        url = 'http://example.com/a'
+        first = make_scraper(tmp_path, [url])
+        second = make_scraper(tmp_path, ['HTTP://example.com:80/a#top'])
+        other = make_scraper(tmp_path, [url], extract_mode='dom')
+        for scraper in (second, other):
+            scraper.browser = first.browser
+        first.browser.release.set()
+        await asyncio.gather(first.scrape(url), second.scrape(second.urls[0]), other.scrape(url))
+        assert len(first.browser.opened) == 2
+        assert len(first.data) == len(second.data) == len(other.data) == 1
+        coalesced = [counter for counter in second.metrics.to_dict()['counters']
+                     if counter['name'] == 'singleflight_coalesced_total']
+        assert coalesced[0]['value'] == 1
+
+    asyncio.run(main())
+
+
+def test_failed_browser_launch_still_closes_the_archive(tmp_path, monkeypatch):
+    @asynccontextmanager
+    async def fake_playwright():
+        yield None
+
+    async def fail_launch(p):
+        raise RuntimeError('no browser')
+
+    monkeypatch.setattr(scraper_module, 'async_playwright', fake_playwright)
+    scraper = make_scraper(tmp_path, ['http://example.com/'], archive={'directory': str(tmp_path / 'archive')},
+                           dedup={'memory_keys': 1})
+    scraper.launch_browser = fail_launch
+    scraper.dedup.filter(['a'], [['1'], ['2']])
+    asyncio.run(scraper.run())
+    assert scraper.archive.file.closed
+    assert scraper.dedup.index is None
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import SingleFlight, fetch_key
+
+
+def test_fetch_key_uses_canonical_url():
+    assert fetch_key('HTTP://Example.com:80/a#top', 'dom') == fetch_key('http://example.com/a', 'dom')
+    assert fetch_key('http://example.com/a', 'dom') != fetch_key('http://example.com/a', 'html')
+
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        results = await asyncio.gather(*[flight.do('key', work) for _ in range(5)])
+        assert calls == [1]
+        assert [result for result, _ in results] == ['result'] * 5
+        assert sorted(shared for _, shared in results) == [False] + [True] * 4
+        assert flight.counters == {'calls': 5, 'executions': 1, 'coalesced': 4}
+        # Done calls are forgotten; the next one runs again.
+        await flight.do('key', work)
+        assert calls == [1, 1]
+
+    asyncio.run(main())
+
+
+def test_exception_is_shared_and_timeout_leaves_call_running():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError('boom')
+
+        results = await asyncio.gather(flight.do('a', fail), flight.do('a', fail), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return 'done'
+
+        waiter = asyncio.ensure_future(flight.do('b', slow))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do('b', slow, timeout=0.01)
+        assert await waiter == ('done', False)
+
+    asyncio.run(main())
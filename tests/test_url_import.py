@@ -0,0 +1,46 @@
+import gzip
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_import import import_urls
+from utils import normalize_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTP://Example.COM:80/a#frag', 'http://example.com/a'),
+    ('https://example.com:443', 'https://example.com/'),
+    ('https://example.com:8443/?q=1', 'https://example.com:8443/?q=1'),
+    ('  http://example.com/path  ', 'http://example.com/path'),
+    ('ftp://example.com/', None),
+    ('example.com/page', None),
+    ('http://exa mple.com/', None),
+    ('http://example.com:99999/', None),
+    ('', None),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_import_skips_duplicates_and_urls_already_stored(tmp_path):
+    dest = str(tmp_path / 'urls.txt')
+    with open(dest, 'w', encoding='utf-8') as f:
+        f.write('http://example.com/old\n')
+    body = 'http://example.com/old\nHTTP://example.com/new#x\nhttp://example.com/new\nnot a url\n'
+    counts = import_urls(io.BytesIO(body.encode('utf-8')), dest=dest, buckets=4)
+    assert (counts['read'], counts['invalid'], counts['duplicates'], counts['added']) == (4, 1, 2, 1)
+    with open(dest, encoding='utf-8') as f:
+        assert f.read().splitlines() == ['http://example.com/old', 'http://example.com/new']
+
+
+def test_import_gzipped_csv_takes_the_url_column(tmp_path):
+    dest = str(tmp_path / 'urls.txt')
+    body = gzip.compress(b'name,url\na,http://example.com/a\nb,http://example.com/b\n')
+    counts = import_urls(io.BytesIO(body), 'csv', dest=dest)
+    assert counts['added'] == 2
+    with open(dest, encoding='utf-8') as f:
+        assert sorted(f.read().splitlines()) == ['http://example.com/a', 'http://example.com/b']
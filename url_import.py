@@ -0,0 +1,165 @@
+
+import csv
+import gzip
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from utils import URLS_FILE, normalize_url
+
+GZIP_MAGIC = b'\x1f\x8b'
+# Reading dest and appending to it must not interleave with another import.
+import_lock = threading.Lock()
+
+
+class PrefixedStream(io.RawIOBase):
+    # Puts the bytes read while sniffing the format back in front of a
+    # non-seekable stream (an HTTP request body).
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.prefix:
+            size = min(len(buffer), len(self.prefix))
+            buffer[:size] = self.prefix[:size]
+            self.prefix = self.prefix[size:]
+            return size
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_text(stream):
+    prefix = stream.read(2)
+    binary = io.BufferedReader(PrefixedStream(prefix, stream), buffer_size=1 << 20)
+    if prefix == GZIP_MAGIC:
+        binary = gzip.GzipFile(fileobj=binary)
+    return io.TextIOWrapper(binary, encoding='utf-8', errors='replace', newline='')
+
+
+def detect_format(name):
+    name = (name or '').lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return 'csv' if name.endswith('.csv') else 'text'
+
+
+def request_format(requested=None, filename=None, content_type=None):
+    if requested in ('text', 'csv'):
+        return requested
+    if filename:
+        return detect_format(filename)
+    return 'csv' if 'csv' in (content_type or '') else 'text'
+
+
+def iter_urls(text, file_format='text'):
+    if file_format != 'csv':
+        return text
+    return iter_csv_urls(text)
+
+
+def iter_csv_urls(text):
+    # Takes the "url" column when there is a header with one, otherwise
+    # the first column.
+    reader = csv.reader(text)
+    first = next(reader, None)
+    if first is None:
+        return
+    lowered = [cell.strip().lower() for cell in first]
+    if 'url' in lowered:
+        position = lowered.index('url')
+    else:
+        position = 0
+        if first:
+            yield first[0]
+    for row in reader:
+        if len(row) > position:
+            yield row[position]
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_urls(stream, file_format='text', dest=URLS_FILE, buckets=64, batch_size=50000):
+    # Two passes keep memory flat regardless of input size: URLs are
+    # normalized and hash-partitioned into bucket files, then each bucket
+    # is deduplicated on its own against the URLs already in dest.
+    started = time.perf_counter()
+    counts = {'read': 0, 'invalid': 0, 'duplicates': 0, 'added': 0}
+    with import_lock, tempfile.TemporaryDirectory(prefix='url_import_') as tmp:
+        paths = [os.path.join(tmp, f"{i}.txt") for i in range(buckets)]
+        files = [open(path, 'w', encoding='utf-8') for path in paths]
+        try:
+            # Existing URLs go first with flag 0 so new ones that repeat
+            # them count as duplicates and are not written again.
+            if os.path.exists(dest):
+                with open(dest, 'r', encoding='utf-8', errors='replace') as f:
+                    for batch in batched(f, batch_size):
+                        partition(batch, files, '0')
+            for batch in batched(iter_urls(open_text(stream), file_format), batch_size):
+                counts['read'] += len(batch)
+                counts['invalid'] += partition(batch, files, '1')
+        finally:
+            for f in files:
+                f.close()
+
+        with open(dest, 'a', encoding='utf-8') as out:
+            for path in paths:
+                added, duplicates = dedupe_bucket(path, out)
+                counts['added'] += added
+                counts['duplicates'] += duplicates
+    counts['seconds'] = round(time.perf_counter() - started, 2)
+    logging.info(f"Imported URLs into {dest}: {counts}")
+    return counts
+
+
+def partition(batch, files, flag):
+    buckets = {}
+    invalid = 0
+    for url in batch:
+        url = normalize_url(url)
+        if url is None:
+            invalid += 1
+            continue
+        buckets.setdefault(hash(url) % len(files), []).append(f"{flag}\t{url}\n")
+    for bucket, lines in buckets.items():
+        files[bucket].write(''.join(lines))
+    return invalid
+
+
+def dedupe_bucket(path, out):
+    seen = set()
+    added = []
+    duplicates = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            flag, url = line[0], line[2:-1]
+            if url in seen:
+                if flag == '1':
+                    duplicates += 1
+                continue
+            seen.add(url)
+            if flag == '1':
+                added.append(url + '\n')
+    out.write(''.join(added))
+    return len(added), duplicates
+
+
+def import_urls_file(path, file_format=None, dest=URLS_FILE):
+    with open(path, 'rb') as f:
+        return import_urls(f, file_format or detect_format(path), dest)
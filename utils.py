@@ -1,14 +1,98 @@
-
-import os
-import json
-
-def load_config():
-    if os.path.exists('config.json'):
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    else:
-        return {}
-
-def save_config(config):
-    with open('config.json', 'w') as f:
-        json.dump(config, f, ensure_ascii=False, indent=4)
+
+import os
+import json
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+def load_config():
+    if os.path.exists('config.json'):
+        with open('config.json', 'r') as f:
+            return json.load(f)
+    else:
+        return {}
+
+def read_metrics():
+    # Summary of the last finished run, from wherever write_outputs put it.
+    path = load_config().get('metrics_file', 'metrics.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_config(config):
+    with open('config.json', 'w') as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+
+def url_host(url):
+    return (urlsplit(url).hostname or '').lower()
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Fast path for the common shape (no userinfo, no IPv6 literal); anything
+# else goes through urlsplit.
+SIMPLE_URL = re.compile(r'([A-Za-z][A-Za-z0-9+.-]*)://([^/?#@\[\]:\s]+)(?::(\d+))?([/?][^#\s]*)?(?:#\S*)?\Z')
+
+def normalize_url(url):
+    # Canonical form used for deduplication: lowercase scheme and host,
+    # no default port, no fragment, "/" for an empty path. Returns None
+    # for anything that is not an absolute http(s) URL.
+    url = url.strip()
+    if not url or ' ' in url:
+        return None
+    match = SIMPLE_URL.match(url)
+    if match:
+        scheme, host, port, rest = match.groups()
+        scheme = scheme.lower()
+        host = host.lower()
+        port = int(port) if port else None
+        if port is not None and port > 65535:
+            return None
+        rest = rest or '/'
+        if rest[0] == '?':
+            rest = '/' + rest
+    else:
+        try:
+            parts = urlsplit(url)
+            scheme = parts.scheme.lower()
+            host = parts.hostname
+            port = parts.port
+        except ValueError:
+            return None
+        if host and ':' in host:
+            host = f"[{host}]"
+        rest = urlunsplit(('', '', parts.path or '/', parts.query, ''))
+    if scheme not in DEFAULT_PORTS or not host:
+        return None
+    if port and port != DEFAULT_PORTS[scheme]:
+        return f"{scheme}://{host}:{port}{rest}"
+    return f"{scheme}://{host}{rest}"
+
+URLS_FILE = 'my_scraper/urls.txt'
+PROXY_FILE = 'my_scraper/proxy.txt'
+
+def read_urls():
+    if not os.path.exists(URLS_FILE):
+        return None
+    with open(URLS_FILE, 'r') as f:
+        return [url.strip() for url in f if url.strip()]
+
+def append_urls(urls):
+    with open(URLS_FILE, 'a') as f:
+        for url in urls:
+            f.write(url + '\n')
+
+def read_proxies():
+    if not os.path.exists(PROXY_FILE):
+        return []
+    with open(PROXY_FILE, 'r') as f:
+        return f.read().split()
+
+def write_proxies(proxies):
+    with open(PROXY_FILE, 'w') as f:
+        for proxy in proxies:
+            f.write(proxy + '\n')
+
+def remove_file(filename):
+    if os.path.exists(filename):
+        os.remove(filename)
+        return True
+    return False
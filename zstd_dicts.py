@@ -0,0 +1,206 @@
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from output_files import atomic_write
+from utils import url_host
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+DICTIONARY_DEFAULTS = {
+    'level': 6,
+    'dict_size': 112640,
+    # Pages collected per host before its first dictionary is trained.
+    'train_samples': 200,
+    # Retrain after this many more pages from the host; 0 keeps the first
+    # dictionary until it is retrained by hand.
+    'retrain_every': 0,
+    # Pages held for training across all hosts; the hosts seen least
+    # recently lose their samples first.
+    'max_sample_bytes': 64 * 1024 * 1024,
+}
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("zstandard is required for zstd page compression: pip install zstandard")
+
+
+class DictionaryStore:
+    # Versioned zstd dictionaries, one series per host. Frames carry the id
+    # of the dictionary they were written with, so every dictionary ever
+    # trained stays on disk and older pages keep decompressing after a
+    # retrain.
+    def __init__(self, directory='dictionaries', level=6, dict_size=112640, train_samples=200, retrain_every=0,
+                 max_sample_bytes=64 * 1024 * 1024):
+        require_zstandard()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.level = level
+        self.dict_size = dict_size
+        self.train_samples = train_samples
+        self.retrain_every = retrain_every
+        self.max_sample_bytes = max_sample_bytes
+        self.manifest_file = os.path.join(directory, 'manifest.json')
+        self.manifest = {}
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        self.dictionaries = {}
+        self.samples = OrderedDict()
+        self.sample_bytes = 0
+        self.since_training = {}
+        self.lock = threading.Lock()
+        # zstd (de)compressor objects must not be shared between threads.
+        self.local = threading.local()
+
+    @classmethod
+    def from_options(cls, directory, options=None):
+        options = dict(DICTIONARY_DEFAULTS, **(options or {}))
+        return cls(directory, options['level'], options['dict_size'], options['train_samples'],
+                   options['retrain_every'], options['max_sample_bytes'])
+
+    def save_manifest(self):
+        with atomic_write(self.manifest_file) as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=4)
+
+    def dictionary(self, dict_id):
+        dictionary = self.dictionaries.get(dict_id)
+        if dictionary is None:
+            with open(os.path.join(self.directory, f"{dict_id}.zdict"), 'rb') as f:
+                dictionary = zstandard.ZstdCompressionDict(f.read())
+            self.dictionaries[dict_id] = dictionary
+        return dictionary
+
+    def current(self, host):
+        versions = self.manifest.get(host)
+        return versions[-1]['id'] if versions else 0
+
+    def train(self, host, samples):
+        dictionary = zstandard.train_dictionary(self.dict_size, samples, level=self.level)
+        dict_id = dictionary.dict_id()
+        with atomic_write(os.path.join(self.directory, f"{dict_id}.zdict"), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        with self.lock:
+            versions = self.manifest.setdefault(host, [])
+            versions.append({
+                'id': dict_id,
+                'version': len(versions) + 1,
+                'created': time.time(),
+                'samples': len(samples),
+                'bytes': len(dictionary.as_bytes()),
+            })
+            self.dictionaries[dict_id] = dictionary
+            self.save_manifest()
+        logging.info(f"Trained zstd dictionary v{len(versions)} for {host} from {len(samples)} pages")
+        return dict_id
+
+    def collect(self, host, data):
+        with self.lock:
+            if self.current(host) and not self.retrain_every:
+                return
+            seen = self.since_training.get(host, 0) + 1
+            self.since_training[host] = seen
+            if self.current(host) and seen < self.retrain_every:
+                return
+            samples = self.samples.setdefault(host, [])
+            self.samples.move_to_end(host)
+            samples.append(data)
+            self.sample_bytes += len(data)
+            if len(samples) < self.train_samples:
+                self.evict_samples()
+                return
+            del self.samples[host]
+            self.sample_bytes -= sum(map(len, samples))
+            self.since_training[host] = 0
+        try:
+            self.train(host, samples)
+        except zstandard.ZstdError as e:
+            logging.error(f"Error training zstd dictionary for {host}: {e}")
+
+    def evict_samples(self):
+        # Called with the lock held. The host just added to is last in the
+        # order and is only dropped if its own samples exceed the budget.
+        while self.sample_bytes > self.max_sample_bytes and self.samples:
+            host, samples = self.samples.popitem(last=False)
+            self.sample_bytes -= sum(map(len, samples))
+            logging.debug(f"Dropped {len(samples)} zstd training samples for {host}")
+
+    def compressor(self, dict_id):
+        compressors = getattr(self.local, 'compressors', None)
+        if compressors is None:
+            compressors = self.local.compressors = {}
+        compressor = compressors.get(dict_id)
+        if compressor is None:
+            if dict_id:
+                compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary(dict_id))
+            else:
+                compressor = zstandard.ZstdCompressor(level=self.level)
+            compressors[dict_id] = compressor
+        return compressor
+
+    def decompressor(self, dict_id):
+        decompressors = getattr(self.local, 'decompressors', None)
+        if decompressors is None:
+            decompressors = self.local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id:
+                decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary(dict_id))
+            else:
+                decompressor = zstandard.ZstdDecompressor()
+            decompressors[dict_id] = decompressor
+        return decompressor
+
+    def compress(self, host, data):
+        # Until a host has enough samples its pages are plain zstd frames.
+        self.collect(host, data)
+        return self.compressor(self.current(host)).compress(data)
+
+    def decompress(self, data):
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        return self.decompressor(dict_id).decompress(data)
+
+
+def train_from_archive(directory, samples=200, options=None):
+    from archive import ArchiveReader
+
+    reader = ArchiveReader(directory)
+    store = DictionaryStore.from_options(os.path.join(directory, 'dictionaries'), options)
+    by_host = {}
+    try:
+        for segment, offset, length in reader.locations():
+            record = reader.read_at(segment, offset, length)
+            pages = by_host.setdefault(url_host(record['url']), [])
+            if len(pages) < samples:
+                pages.append(record['html'].encode('utf-8'))
+    finally:
+        reader.close()
+    trained = {}
+    for host, pages in by_host.items():
+        try:
+            trained[host] = store.train(host, pages)
+        except zstandard.ZstdError as e:
+            logging.error(f"Error training zstd dictionary for {host}: {e}")
+    return trained
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train per-host zstd dictionaries from archived pages")
+    parser.add_argument('archive', nargs='?', default='archive')
+    parser.add_argument('--samples', type=int, default=200, help="pages per host to train on")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for host, dict_id in train_from_archive(args.archive, args.samples).items():
+        print(f"{host}: dictionary {dict_id}")